@@ -4,14 +4,20 @@ from pygame.sprite import Sprite
 
 class Alien(Sprite):
     """A class to represent a single alien in the fleet."""
-    
+    image = None
+    mask = None
+
     def __init__(self, ai_game):
         """Initialize the alien and set its starting position."""
         super().__init__()
         self.screen = ai_game.screen
 
-        # Load the alien image and set its rect attribute.
-        self.image = pygame.image.load('images/alien.png')
+        # Load the alien image and its mask once and share them.
+        if Alien.image is None:
+            Alien.image = pygame.image.load('images/alien.png')
+            Alien.mask = pygame.mask.from_surface(Alien.image)
+        self.image = Alien.image
+        self.mask = Alien.mask
         self.rect = self.image.get_rect()
         self.settings = ai_game.settings
 
@@ -22,10 +28,17 @@ class Alien(Sprite):
         # Store the alien's exact horizontal position.
         self.x = float(self.rect.x)
         self.y = float(self.rect.y)
-        self.level = ai_game.selected_level
         self.has_powerup = False
 
-        if self.level == 2:
+        # Movement comes from the current wave. Scripted patterns follow
+        # the wave's precomputed path from a home position.
+        wave = ai_game.wave
+        self.pattern = wave.pattern
+        self.path_x, self.path_y = wave.path_x, wave.path_y
+        self.home_x, self.home_y = self.rect.x, self.rect.y
+        self.phase = 0
+
+        if self.pattern == 'bounce':
             self.speed_x = random.choice([-1, 1]) * self.settings.alien_speed
             self.speed_y = random.choice([-1, 1]) * self.settings.alien_speed
         
@@ -34,13 +47,13 @@ class Alien(Sprite):
         screen_rect = self.screen.get_rect()
         return (self.rect.right >= screen_rect.right) or (self.rect.left <= 0)
 
-    def update(self):
-        """Move the alien based on the current level logic."""
-        if self.level == 1:
+    def update(self, tick=0):
+        """Move the alien based on the current wave's pattern."""
+        if self.pattern == 'march':
             # Standard fleet movement
             self.x += self.settings.alien_speed * self.settings.fleet_direction
             self.rect.x = self.x
-        elif self.level == 2:
+        elif self.pattern == 'bounce':
             # Random independent movement
             self.x += self.speed_x
             self.y += self.speed_y
@@ -53,3 +66,8 @@ class Alien(Sprite):
                 self.speed_x *= -1
             if self.rect.bottom >= screen_rect.bottom or self.rect.top <= 0:
                 self.speed_y *= -1
+        elif self.path_x:
+            # Scripted movement: look up this tick's offset.
+            step = (tick + self.phase) % len(self.path_x)
+            self.rect.x = self.x = self.home_x + self.path_x[step]
+            self.rect.y = self.y = self.home_y + self.path_y[step]
@@ -4,31 +4,25 @@ from pygame.sprite import Sprite
 
 class AlienBullet(Sprite):
     """A class to manage bullets fired from aliens."""
+    # Rotated images and masks, keyed by rotation bucket.
+    rotations = {}
 
-    def __init__(self, ai_game, alien):
+    def __init__(self, ai_game, alien, target=None):
         """Create a bullet object at the alien's current position."""
         super().__init__()
         self.screen = ai_game.screen
         self.settings = ai_game.settings
 
-        # Load the alien laser image.
-        try:
-            self.image = pygame.image.load('images/missile.png')
-        except FileNotFoundError:
-            # Fallback if image is missing
-            self.image = pygame.Surface((self.settings.bullet_width, self.settings.bullet_height))
-            self.image.fill((255, 0, 0))
-
-        # Calculate angle to the ship
-        ship = ai_game.ship
+        # Calculate angle to the target ship
+        ship = target or ai_game.ship
         dx = ship.rect.centerx - alien.rect.centerx
         dy = ship.rect.centery - alien.rect.centery
         angle = math.atan2(dy, dx)
         
-        # Rotate the image to point towards the ship (assuming missile points UP by default)
-        self.image = pygame.transform.rotate(self.image, -math.degrees(angle) - 90)
-
-        self.rect = self.image.get_rect()
+        # Rotate the image to point towards the ship (assuming missile points UP by default).
+        # Rotations are snapped to buckets so each one is only built once.
+        bucket_size = self.settings.rotation_bucket
+        self._set_rotation(round((-math.degrees(angle) - 90) / bucket_size) * bucket_size % 360)
         self.rect.center = alien.rect.center
         
         # Store the bullet's position and velocity.
@@ -37,6 +31,39 @@ class AlienBullet(Sprite):
         self.x_speed = math.cos(angle) * self.settings.alien_bullet_speed
         self.y_speed = math.sin(angle) * self.settings.alien_bullet_speed
 
+    @classmethod
+    def restore(cls, ai_game, x, y, x_speed, y_speed, rotation):
+        """Recreate a bullet from a saved game state."""
+        bullet = cls.__new__(cls)
+        Sprite.__init__(bullet)
+        bullet.screen = ai_game.screen
+        bullet.settings = ai_game.settings
+        bullet._set_rotation(rotation)
+        bullet.x, bullet.y = x, y
+        bullet.rect.x, bullet.rect.y = x, y
+        bullet.x_speed, bullet.y_speed = x_speed, y_speed
+        return bullet
+
+    def _set_rotation(self, rotation):
+        """Use the image and mask for rotation and reset the rect."""
+        self.rotation = rotation
+        if rotation not in AlienBullet.rotations:
+            AlienBullet.rotations[rotation] = self._rotate_image(rotation)
+        self.image, self.mask = AlienBullet.rotations[rotation]
+        self.rect = self.image.get_rect()
+
+    def _rotate_image(self, rotation):
+        """Load the alien laser image, rotate it, and build its mask."""
+        try:
+            image = pygame.image.load('images/missile.png')
+        except FileNotFoundError:
+            # Fallback if image is missing
+            image = pygame.Surface((self.settings.bullet_width, self.settings.bullet_height))
+            image.fill((255, 0, 0))
+
+        image = pygame.transform.rotate(image, rotation)
+        return image, pygame.mask.from_surface(image)
+
     def update(self):
         """Move the bullet towards the target."""
         self.x += self.x_speed
@@ -1,4 +1,6 @@
+import argparse
 import sys
+import time
 
 import pygame
 import random
@@ -9,19 +11,27 @@ from scoreboard import Scoreboard
 from ship import Ship
 from bullet import Bullet
 from alien import Alien
-from explosion import Explosion
+from particles import ParticleSystem
 from alien_bullet import AlienBullet
 from powerup import PowerUp
 from star import Star
+from frame_capture import FrameCapture
+from collision import collide_pixels
+from netplay import NetHost, NetClient
+from game_state import (capture_state, restore_state, save_state, load_state,
+        RewindBuffer)
+from telemetry import Telemetry
+from input_handler import InputHandler
+from waves import load_waves, FireSchedule
 
 class AlienInvasion:
     """Overall class to manage game assets and behaviour."""
     
-    def __init__(self):
+    def __init__(self, settings=None):
         """Initialize the game, and create game resources."""
         pygame.init()
         self.clock = pygame.time.Clock()
-        self.settings = Settings()
+        self.settings = settings or Settings()
         
         pygame.mixer.init()
         try:
@@ -35,12 +45,16 @@ class AlienInvasion:
         pygame.display.set_caption("Alien Invasion")
         self.ship = Ship(self)
         self.bullets = pygame.sprite.Group()
+        self.partner_bullets = pygame.sprite.Group()
         self.alien_bullets = pygame.sprite.Group()
         self.aliens = pygame.sprite.Group()
-        self.explosions = pygame.sprite.Group()
         self.stars = pygame.sprite.Group()
         self.powerups = pygame.sprite.Group()
+        self.particles = ParticleSystem(self)
         
+        # Rect-only collisions unless pixel-accurate ones are enabled.
+        self.collided = collide_pixels if self.settings.pixel_collisions else None
+
         # Create an instance to store game statistics.
         self.stats = GameStats(self)
         self.sb = Scoreboard(self)
@@ -53,42 +67,113 @@ class AlienInvasion:
         self.first_game = True
         self.selected_level = 1
 
+        # Waves are loaded once; selected_level picks one, counting from 1.
+        self.waves = load_waves(self.settings.waves_file)
+        self.fleet = []
+        self.fleet_tick = 0
+        self.fire_schedule = None
+
         # Power-up state
         self.powerup_active = False
         self.powerup_start_time = 0
         self.paused = False
+        self.pause_start_time = 0
+
+        # Timestamped input with latency measurement.
+        self.input = InputHandler(self)
+
+        # Session events for analytics, written out in the background.
+        self.telemetry = Telemetry(self)
+
+        # Recent states for rewinding, and frames since the last checkpoint.
+        self.rewind_buffer = RewindBuffer(
+                self.settings.rewind_seconds * self.settings.frame_rate,
+                self.settings.rewind_keyframe_interval)
+        self.rewinding = False
+        self.checkpoint_frames = 0
+
+        # Co-op state; the partner's ship only exists while hosting.
+        self.partner = None
+        self.net_host = None
+
+        # Gameplay capture copies each presented frame out of the screen.
+        self.capture = FrameCapture(self)
+        if self.settings.capture_enabled:
+            self.capture.start()
 
         self._create_starfield()
         self._create_fleet()
 
+    @property
+    def wave(self):
+        """Return the wave for the selected level."""
+        return self.waves[self.selected_level - 1]
+
+    def start_hosting(self, port):
+        """Add a partner ship driven by a remote player on port."""
+        self.partner = Ship(self)
+        self.net_host = NetHost(self, port)
+
     def run_game(self):
         """Start the main loop for the game."""
         while True:
-            self._check_events()
-            self.stars.update()
-            if self.game_active:
-                if not self.paused:
-                    self.ship.update()
-                    self._update_bullets()
-                    self._update_alien_bullets()
-                    self._update_powerups()
-                    self._update_aliens()
-            self._update_explosions()
-            self._update_screen()
-            self.clock.tick(60)
-            
+            self.input.start_frame()
+            self._run_frame()
+            self.telemetry.record_frame(time.perf_counter() - self.input.frame_start)
+            self.input.wait_for_frame(self.clock, self.settings.frame_rate)
+
+    def _run_frame(self):
+        """Handle input, update the game, and draw a single frame."""
+        self._check_events()
+        if self.net_host:
+            self.net_host.receive_inputs()
+        self.stars.update()
+        late_latch = False
+        if self.rewinding and not self.first_game:
+            self._rewind()
+        elif self.game_active:
+            if not self.paused:
+                late_latch = self.settings.input_late_latch
+                if not late_latch:
+                    self._update_ships()
+                self._update_bullets()
+                self._update_alien_bullets()
+                self._update_powerups()
+                self._update_aliens()
+                self._record_state()
+        self.input.mark_updated()
+        self._update_explosions()
+        if self.net_host:
+            self.net_host.send_snapshot()
+        self._update_screen(late_latch)
+
+    def _update_ships(self):
+        """Move every player's ship."""
+        for ship in self._player_ships():
+            ship.update()
+
+    def _player_ships(self):
+        """Return the ships of every player in the game.
+
+        The partner's ship only takes part once a partner has connected.
+        """
+        if self.partner and self.net_host.partner_address:
+            return (self.ship, self.partner)
+        return (self.ship,)
 
     def _check_events(self):
         """Respond to keypresses and mouse events."""
-        for event in pygame.event.get():
+        for event in self.input.take_events():
             if event.type == pygame.QUIT:
-                self._save_high_score()
-                sys.exit()
+                self._quit_game()
             elif event.type == pygame.KEYDOWN:
                 self._check_keydown_events(event)
             elif event.type == pygame.KEYUP:
                 self._check_keyup_events(event)
 
+        if self.game_active and self.settings.input_poll_held_keys:
+            self.input.sync_held_keys(self.ship)
+
     def _check_keydown_events(self, event):
         if event.key == pygame.K_RIGHT and self.game_active:
             # Move the ship to the right
@@ -101,32 +186,41 @@ class AlienInvasion:
         elif event.key == pygame.K_DOWN and self.game_active:
             self.ship.moving_down = True
         elif event.key == pygame.K_p and self.game_active:
-            self.paused = not self.paused
+            self._toggle_pause()
         elif event.key == pygame.K_q:
             if self.game_active:
                 self.game_active = False
                 self.first_game = True
                 self.paused = False
             else:
-                self._save_high_score()
-                sys.exit()
+                self._quit_game()
+        elif event.key == pygame.K_F12:
+            self.capture.toggle()
+        elif event.key == pygame.K_BACKSPACE and not self.first_game:
+            self.rewinding = True
+        elif event.key == pygame.K_F5 and self.game_active:
+            save_state(self.settings.quicksave_file, capture_state(self))
+        elif event.key == pygame.K_F9 and not self.first_game:
+            self._load_state_file(self.settings.quicksave_file)
         elif event.key == pygame.K_SPACE and self.game_active:
             self._fire_bullet()
         elif event.key == pygame.K_s and self.first_game:
-            if self.selected_level in (1, 2, 3):
+            if 1 <= self.selected_level <= len(self.waves):
                 self.aliens.empty()
                 self.stats.reset_stats()
                 self.sb.prep_score()
                 self._create_fleet()
+                self.rewind_buffer.clear()
                 self.game_active = True
                 self.first_game = False
+                self.telemetry.emit('session_start', self.selected_level)
         elif event.key == pygame.K_r and not self.game_active and not self.first_game:
             self._reset_game()
         elif self.first_game:
             if event.key == pygame.K_UP:
                 self.selected_level = max(1, self.selected_level - 1)
             elif event.key == pygame.K_DOWN:
-                self.selected_level = min(3, self.selected_level + 1)
+                self.selected_level = min(len(self.waves), self.selected_level + 1)
 
     def _check_keyup_events(self, event):   
         if event.key == pygame.K_RIGHT:
@@ -139,17 +233,36 @@ class AlienInvasion:
             self.ship.moving_up = False
         elif event.key == pygame.K_DOWN:
             self.ship.moving_down = False
+        elif event.key == pygame.K_BACKSPACE:
+            self.rewinding = False
             
-    def _fire_bullet(self):
+    def _toggle_pause(self):
+        """Pause or resume the game, recording how long it was paused."""
+        self.paused = not self.paused
+        if self.paused:
+            self.pause_start_time = pygame.time.get_ticks()
+        else:
+            seconds = (pygame.time.get_ticks() - self.pause_start_time) / 1000
+            self.telemetry.emit('pause', self.selected_level, seconds)
+
+    def _fire_bullet(self, ship=None, bullets=None):
         """Create a new bullet and add it to the bullets group."""
-        if len(self.bullets) < self.settings.bullet_allowed:
-            new_bullet = Bullet(self)
-            self.bullets.add(new_bullet)
+        ship = ship or self.ship
+        if bullets is None:
+            bullets = self.bullets
+        if len(bullets) < self.settings.bullet_allowed:
+            new_bullet = Bullet(self, ship)
+            bullets.add(new_bullet)
+            self.telemetry.emit('shot', self.selected_level)
             if self.shoot_sound:
                 self.shoot_sound.play()
     
-    def _update_screen(self):
-        """Update images on the screen, and flip to the new screen."""
+    def _update_screen(self, late_latch=False):
+        """Update images on the screen, and flip to the new screen.
+
+        With late_latch the ships are moved by the keys held just before
+        the flip, and drawn last.
+        """
         self.screen.fill(self.settings.bg_color)
         self.stars.draw(self.screen)
 
@@ -158,14 +271,17 @@ class AlienInvasion:
         else:
             for bullet in self.bullets.sprites():
                 bullet.draw_bullet()
+            for bullet in self.partner_bullets.sprites():
+                bullet.draw_bullet()
             for bullet in self.alien_bullets.sprites():
                 bullet.draw_bullet()
             self.powerups.draw(self.screen)
             self.sb.show_score()
-            self.ship.blitme()
+            if not late_latch:
+                for ship in self._player_ships():
+                    ship.blitme()
             self.aliens.draw(self.screen)
-            for explosion in self.explosions.sprites():
-                explosion.draw_explosion()
+            self.particles.draw()
             
             if self.paused:
                 self._draw_pause_message()
@@ -173,7 +289,15 @@ class AlienInvasion:
             if not self.game_active:
                 self._draw_game_over_message()
 
+        if late_latch:
+            self.input.latch(self.ship)
+            self._update_ships()
+            for ship in self._player_ships():
+                ship.blitme()
+
+        self.capture.capture_frame()
         pygame.display.flip()
+        self.input.mark_presented()
 
     def _draw_menu(self):
         """Draw the start menu."""
@@ -184,7 +308,7 @@ class AlienInvasion:
         self.screen.blit(title_image, title_rect)
 
         # Draw Level Selection Box
-        box_width, box_height = 400, 300
+        box_width, box_height = 400, 100 + 55 * len(self.waves)
         box_rect = pygame.Rect(0, 0, box_width, box_height)
         box_rect.center = self.screen.get_rect().center
         pygame.draw.rect(self.screen, (0, 0, 0), box_rect, 2)
@@ -193,29 +317,19 @@ class AlienInvasion:
         level_label_rect = level_label.get_rect(centerx=box_rect.centerx, top=box_rect.top + 10)
         self.screen.blit(level_label, level_label_rect)
 
-        # Level 1
-        l1_color = (0, 150, 0) if self.selected_level == 1 else (100, 100, 100)
-        l1_text = "> Level 1 <" if self.selected_level == 1 else "  Level 1  "
-        l1_image = self.font.render(l1_text, True, l1_color, self.settings.bg_color)
-        l1_rect = l1_image.get_rect(centerx=box_rect.centerx, top=level_label_rect.bottom + 40)
-        self.screen.blit(l1_image, l1_rect)
-
-        # Level 2
-        l2_color = (0, 150, 0) if self.selected_level == 2 else (100, 100, 100)
-        l2_text = "> Level 2 <" if self.selected_level == 2 else "  Level 2  "
-        l2_image = self.font.render(l2_text, True, l2_color, self.settings.bg_color)
-        l2_rect = l2_image.get_rect(centerx=box_rect.centerx, top=l1_rect.bottom + 20)
-        self.screen.blit(l2_image, l2_rect)
-
-        # Level 3 (Placeholder)
-        l3_color = (0, 150, 0) if self.selected_level == 3 else (100, 100, 100)
-        l3_text = "> Level 3 <" if self.selected_level == 3 else "  Level 3  "
-        l3_image = self.font.render(l3_text, True, l3_color, self.settings.bg_color)
-        l3_rect = l3_image.get_rect(centerx=box_rect.centerx, top=l2_rect.bottom + 20)
-        self.screen.blit(l3_image, l3_rect)
+        # One line per wave
+        top = level_label_rect.bottom + 40
+        for number, wave in enumerate(self.waves, 1):
+            selected = number == self.selected_level
+            color = (0, 150, 0) if selected else (100, 100, 100)
+            text = f"> {wave.name} <" if selected else f"  {wave.name}  "
+            image = self.font.render(text, True, color, self.settings.bg_color)
+            rect = image.get_rect(centerx=box_rect.centerx, top=top)
+            self.screen.blit(image, rect)
+            top = rect.bottom + 20
 
         # Render instructions
-        instructions = f"Press 'S' to Start Level {self.selected_level}"
+        instructions = f"Press 'S' to Start {self.wave.name}"
         instr_image = self.font.render(instructions, True, (60, 60, 60), self.settings.bg_color)
         instr_rect = instr_image.get_rect(centerx=self.screen.get_rect().centerx, bottom=self.screen.get_rect().bottom - 100)
         self.screen.blit(instr_image, instr_rect)
@@ -246,35 +360,43 @@ class AlienInvasion:
 
     def _update_bullets(self):
         """Update position of bullets and get rid of old bullets"""
-        # Update bullet position
-        self.bullets.update()
-
-        # Get rid of bullets that have disappeared off any edge.
-        for bullet in self.bullets.copy():
-            if (bullet.rect.bottom <= 0 or 
-                bullet.rect.top >= self.settings.screen_height or
-                bullet.rect.right <= 0 or 
-                bullet.rect.left >= self.settings.screen_width):
-                self.bullets.remove(bullet)
-
-        # Check for any bullets that have hit aliens.
-        # If so, get rid of the bullet and the alien.
-        collisions = pygame.sprite.groupcollide(self.bullets, self.aliens, True, True)
-        if collisions:
-            if self.explosion_sound:
-                self.explosion_sound.play()
-            for aliens_hit in collisions.values():
-                self.stats.score += self.settings.alien_points * len(aliens_hit)
-                for alien in aliens_hit:
-                    new_explosion = Explosion(self, alien.rect.center)
-                    self.explosions.add(new_explosion)
-                    # Chance to spawn a power-up
-                    if getattr(alien, 'has_powerup', False):
-                        self.powerups.add(PowerUp(self, alien.rect.center))
-            self.sb.prep_score()
-            
-            if self.stats.score > self.stats.high_score:
-                self.stats.high_score = self.stats.score
+        for bullets in (self.bullets, self.partner_bullets):
+            # Update bullet position
+            bullets.update()
+
+            # Get rid of bullets that have disappeared off any edge.
+            for bullet in bullets.copy():
+                if (bullet.rect.bottom <= 0 or 
+                    bullet.rect.top >= self.settings.screen_height or
+                    bullet.rect.right <= 0 or 
+                    bullet.rect.left >= self.settings.screen_width):
+                    bullets.remove(bullet)
+
+            # Check for any bullets that have hit aliens.
+            # If so, get rid of the bullet and the alien.
+            collisions = pygame.sprite.groupcollide(bullets, self.aliens, True, True,
+                    self.collided)
+            if collisions:
+                self._score_hits(collisions)
+
+    def _score_hits(self, collisions):
+        """Score the aliens hit by bullets and blow them up."""
+        if self.explosion_sound:
+            self.explosion_sound.play()
+        for aliens_hit in collisions.values():
+            self.stats.score += self.settings.alien_points * len(aliens_hit)
+            for alien in aliens_hit:
+                self.particles.spawn_burst(alien.rect.center)
+                # Chance to spawn a power-up
+                if getattr(alien, 'has_powerup', False):
+                    self.powerups.add(PowerUp(self, alien.rect.center))
+        self.sb.prep_score()
+        self.telemetry.emit('hit', self.selected_level,
+                sum(len(aliens_hit) for aliens_hit in collisions.values()),
+                self.stats.score)
+        
+        if self.stats.score > self.stats.high_score:
+            self.stats.high_score = self.stats.score
 
     def _update_alien_bullets(self):
         """Update position of alien bullets and check for collisions."""
@@ -285,9 +407,11 @@ class AlienInvasion:
             if bullet.rect.top >= self.settings.screen_height:
                 self.alien_bullets.remove(bullet)
 
-        # Check for collisions with the ship.
-        if pygame.sprite.spritecollideany(self.ship, self.alien_bullets):
-            self._ship_hit()
+        # Check for collisions with the ships.
+        for ship in self._player_ships():
+            if pygame.sprite.spritecollideany(ship, self.alien_bullets, self.collided):
+                self._ship_hit(ship)
+                break
 
     def _update_powerups(self):
         """Update power-ups and check for collisions."""
@@ -298,20 +422,24 @@ class AlienInvasion:
             if powerup.rect.top >= self.settings.screen_height:
                 self.powerups.remove(powerup)
 
-        # Check for collisions with the ship
-        if pygame.sprite.spritecollide(self.ship, self.powerups, True):
-            self.settings.bullet_width = 300
-            self.powerup_active = True
-            self.powerup_start_time = pygame.time.get_ticks()
+        # Check for collisions with the ships
+        for ship in self._player_ships():
+            if pygame.sprite.spritecollide(ship, self.powerups, True, self.collided):
+                self.settings.bullet_width = 300
+                self.powerup_active = True
+                self.powerup_start_time = pygame.time.get_ticks()
+                self.telemetry.emit('powerup_pickup', self.selected_level)
 
         # Check if power-up effect should expire (5 seconds)
         if self.powerup_active and pygame.time.get_ticks() - self.powerup_start_time > 5000:
             self.settings.bullet_width = 3
             self.powerup_active = False
+            self.telemetry.emit('powerup_expired', self.selected_level)
 
     def _update_aliens(self):
         """Update the positions of all aliens in the fleet."""
-        if self.selected_level == 3:
+        self.fleet_tick += 1
+        if self.wave.pattern == 'chase':
             for alien in self.aliens.sprites():
                 dx = self.ship.rect.centerx - alien.rect.centerx
                 dy = self.ship.rect.centery - alien.rect.centery
@@ -322,37 +450,57 @@ class AlienInvasion:
                     alien.rect.x = alien.x
                     alien.rect.y = alien.y
         else:
-            if self.selected_level == 1:
+            if self.wave.pattern == 'march':
                 self._check_fleet_edges()
-            self.aliens.update()
+            self.aliens.update(self.fleet_tick)
 
         # Look for alien-ship collisions.
-        if pygame.sprite.spritecollideany(self.ship, self.aliens):
-            self._ship_hit()
+        for ship in self._player_ships():
+            if pygame.sprite.spritecollideany(ship, self.aliens, self.collided):
+                self._ship_hit(ship)
+                break
             
-        # Alien firing logic for Level 2 and 3
-        if self.selected_level in (2, 3):
-            if self.aliens and random.random() < 0.01:
-                firing_alien = random.choice(self.aliens.sprites())
+        # Alien firing follows the wave's precomputed schedule.
+        if self.fire_schedule.due(self.fleet_tick):
+            firing_alien = self._pick_firing_alien()
+            if firing_alien:
                 self._fire_alien_bullet(firing_alien)
 
-    def _ship_hit(self):
-        """Respond to the ship being hit by an alien."""
+    def _pick_firing_alien(self):
+        """Return a random surviving alien, or None if there are none."""
+        fleet = self.fleet
+        while fleet:
+            index = random.randrange(len(fleet))
+            alien = fleet[index]
+            if alien.alive():
+                return alien
+            # Forget dead aliens as they are found.
+            fleet[index] = fleet[-1]
+            fleet.pop()
+        return None
+
+    def _ship_hit(self, ship=None):
+        """Respond to a ship being hit by an alien."""
+        ship = ship or self.ship
         # Create explosion at ship's position.
-        new_explosion = Explosion(self, self.ship.rect.center)
-        self.explosions.add(new_explosion)
+        self.particles.spawn_burst(ship.rect.center)
         
         self.stats.ships_left -= 1
+        self.telemetry.emit('death', self.selected_level, self.stats.ships_left,
+                self.stats.score)
         if self.stats.ships_left > 0:
             self.aliens.empty()
             self.bullets.empty()
+            self.partner_bullets.empty()
             self.alien_bullets.empty()
             self.powerups.empty()
             self._create_fleet()
-            self.ship.center_ship()
-            pygame.time.delay(500)
+            for ship in self._player_ships():
+                ship.center_ship()
+            pygame.time.delay(self.settings.ship_hit_delay)
         else:
-            self.ship.visible = False
+            for ship in self._player_ships():
+                ship.visible = False
             self.game_active = False
         
     def _reset_game(self):
@@ -361,16 +509,20 @@ class AlienInvasion:
         # Clear out any remaining aliens, bullets, and explosions.
         self.aliens.empty()
         self.bullets.empty()
+        self.partner_bullets.empty()
         self.alien_bullets.empty()
         self.powerups.empty()
-        self.explosions.empty()
+        self.particles.empty()
         
-        # Create a new fleet and center the ship.
+        # Create a new fleet and center the ships.
         self._create_fleet()
-        self.ship.center_ship()
+        for ship in self._player_ships():
+            ship.center_ship()
         
         # Restart the game state.
+        self.rewind_buffer.clear()
         self.game_active = True
+        self.telemetry.emit('session_start', self.selected_level)
         self.stats.reset_stats()
         self.sb.prep_score()
         
@@ -378,14 +530,56 @@ class AlienInvasion:
         self.settings.bullet_width = 3
         self.powerup_active = False
 
+    def _quit_game(self):
+        """Save the high score, finish capture and telemetry, and exit."""
+        self._save_high_score()
+        self.capture.close()
+        for histogram in (self.input.update_latency, self.input.present_latency):
+            self.telemetry.emit('input_latency', histogram.name, histogram.count,
+                    histogram.percentile(0.5), histogram.percentile(0.95),
+                    histogram.percentile(0.99))
+        self.telemetry.stop()
+        if self.settings.input_latency_report:
+            print('\n'.join(self.input.report()))
+        if self.net_host:
+            self.net_host.close()
+        sys.exit()
+
+    def _record_state(self):
+        """Keep this frame's state for rewinding and write checkpoints."""
+        state = capture_state(self)
+        self.rewind_buffer.push(state)
+
+        if self.settings.checkpoint_seconds:
+            self.checkpoint_frames += 1
+            if self.checkpoint_frames >= self.settings.checkpoint_seconds * self.settings.frame_rate:
+                self.checkpoint_frames = 0
+                save_state(self.settings.checkpoint_file, state)
+
+    def _rewind(self):
+        """Step back to the previous recorded state, if there is one."""
+        state = self.rewind_buffer.pop()
+        if state:
+            restore_state(self, state)
+
+    def _load_state_file(self, path):
+        """Restore a saved state, ignoring missing or unreadable files."""
+        state = load_state(path)
+        if state:
+            try:
+                restore_state(self, state)
+            except ValueError:
+                return
+            self.rewind_buffer.clear()
+
     def _save_high_score(self):
         """Save the high score to a file."""
-        with open('high_score.txt', 'w') as f:
+        with open(self.settings.high_score_file, 'w') as f:
             f.write(str(self.stats.high_score))
 
     def _update_explosions(self):
         """Update the positions/state of all explosions."""
-        self.explosions.update()
+        self.particles.update()
         
     def _check_fleet_edges(self):
         """Respond appropriately if any aliens have reached an edge."""
@@ -404,13 +598,14 @@ class AlienInvasion:
         """Create the fleet of aliens."""
         # Create an alien and keep adding aliens until there's no room left
         # Spacing between aliens is one alien width and one alien height.
+        wave = self.wave
         alien = Alien(self)
         alien_width, alien_height = alien.rect.size
 
-        x_spacing = 4 * alien_width
-        if self.selected_level == 3:
-            x_spacing = 8 * alien_width
+        x_spacing = wave.x_spacing * alien_width
+        y_spacing = wave.y_spacing * alien_height
 
+        rows = 0
         current_x, current_y = alien_width, alien_height
         while current_y < (self.settings.screen_height - 3 * alien_height):
             while current_x < (self.settings.screen_width - 2 * alien_width):
@@ -419,11 +614,19 @@ class AlienInvasion:
 
             # Finished a row; rest x value, and increment y value.
             current_x = alien_width
-            current_y += 8 * alien_height
+            current_y += y_spacing
+            rows += 1
+            if rows == wave.rows:
+                break
             
-        # Assign powerup to one random alien
-        if self.aliens:
-            random.choice(self.aliens.sprites()).has_powerup = True
+        # Assign power-ups to random aliens
+        self.fleet = self.aliens.sprites()
+        for alien in random.sample(self.fleet, min(wave.powerups, len(self.fleet))):
+            alien.has_powerup = True
+
+        # Restart the wave's clock and firing schedule.
+        self.fleet_tick = 0
+        self.fire_schedule = FireSchedule(wave.fire_rate, self.settings.frame_rate)
 
 
     def _create_alien(self, x_position, y_position):
@@ -433,6 +636,9 @@ class AlienInvasion:
         new_alien.y = y_position
         new_alien.rect.x = x_position
         new_alien.rect.y = y_position
+        new_alien.home_x = x_position
+        new_alien.home_y = y_position
+        new_alien.phase = len(self.aliens) * self.wave.phase_step
         self.aliens.add(new_alien)
 
     def _create_starfield(self):
@@ -442,11 +648,29 @@ class AlienInvasion:
             self.stars.add(star)
 
     def _fire_alien_bullet(self, alien):
-        """Create a new alien bullet."""
-        new_bullet = AlienBullet(self, alien)
+        """Create a new alien bullet aimed at one of the players."""
+        new_bullet = AlienBullet(self, alien, random.choice(self._player_ships()))
         self.alien_bullets.add(new_bullet)
 
 if __name__ == '__main__':
-    # Make a game instance, and run the game.
-    ai = AlienInvasion()
-    ai.run_game()
+    parser = argparse.ArgumentParser(description="Play Alien Invasion.")
+    parser.add_argument('--host', action='store_true',
+            help="host a co-op game for a partner to join")
+    parser.add_argument('--join', metavar='ADDRESS',
+            help="join the co-op game hosted at ADDRESS")
+    parser.add_argument('--port', type=int, default=Settings().net_port)
+    parser.add_argument('--resume', action='store_true',
+            help="carry on from the last crash-recovery checkpoint")
+    args = parser.parse_args()
+
+    if args.join:
+        NetClient(args.join, args.port).run()
+    else:
+        # Make a game instance, and run the game.
+        ai = AlienInvasion()
+        # Host first so a co-op checkpoint can put the partner back too.
+        if args.host:
+            ai.start_hosting(args.port)
+        if args.resume:
+            ai._load_state_file(ai.settings.checkpoint_file)
+        ai.run_game()
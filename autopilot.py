@@ -0,0 +1,90 @@
+import random
+
+import pygame
+
+class Autopilot:
+    """A class to play the game by posting scripted key presses."""
+
+    movement_keys = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN)
+
+    def __init__(self, ai_game, seed=None, fire_chance=0.2, pause_chance=0.001,
+            quit_chance=0.0005):
+        """Initialize the autopilot's random source and behaviour."""
+        self.ai_game = ai_game
+        self.random = random.Random(seed)
+        self.fire_chance = fire_chance
+        self.pause_chance = pause_chance
+        self.quit_chance = quit_chance
+
+        self.held_keys = set()
+        self.frames_until_turn = 0
+        self.pause_frames_left = 0
+        # Levels are played in turn: 1, 2, 3, ..., 1, ...
+        self.next_level = 1
+
+    def post_events(self):
+        """Post this frame's key events to the pygame event queue."""
+        for event_type, key in self.next_keys():
+            pygame.event.post(pygame.event.Event(event_type, key=key))
+
+    def next_keys(self):
+        """Return a list of (event type, key) pairs for this frame."""
+        if self.ai_game.first_game:
+            return self._menu_keys()
+        if not self.ai_game.game_active:
+            return self._game_over_keys()
+        if self.ai_game.paused:
+            return self._paused_keys()
+        return self._play_keys()
+
+    def _release_keys(self):
+        """Return KEYUP events for every key being held."""
+        keys = [(pygame.KEYUP, key) for key in self.held_keys]
+        self.held_keys.clear()
+        return keys
+
+    def _menu_keys(self):
+        """Select the next level in turn and start it."""
+        keys = self._release_keys()
+        selected = self.ai_game.selected_level
+        if selected < self.next_level:
+            keys.append((pygame.KEYDOWN, pygame.K_DOWN))
+        elif selected > self.next_level:
+            keys.append((pygame.KEYDOWN, pygame.K_UP))
+        else:
+            keys.append((pygame.KEYDOWN, pygame.K_s))
+            self.next_level = self.next_level % len(self.ai_game.waves) + 1
+        return keys
+
+    def _game_over_keys(self):
+        """Restart the game; 'Q' here would quit the program."""
+        return self._release_keys() + [(pygame.KEYDOWN, pygame.K_r)]
+
+    def _paused_keys(self):
+        """Stay paused for a while, then resume."""
+        self.pause_frames_left -= 1
+        if self.pause_frames_left <= 0:
+            return [(pygame.KEYDOWN, pygame.K_p)]
+        return []
+
+    def _play_keys(self):
+        """Steer, fire, and now and then pause or quit to the menu."""
+        if self.random.random() < self.quit_chance:
+            return self._release_keys() + [(pygame.KEYDOWN, pygame.K_q)]
+        if self.random.random() < self.pause_chance:
+            self.pause_frames_left = self.random.randint(10, 120)
+            return [(pygame.KEYDOWN, pygame.K_p)]
+
+        keys = []
+        self.frames_until_turn -= 1
+        if self.frames_until_turn <= 0:
+            self.frames_until_turn = self.random.randint(5, 60)
+            wanted = set(self.random.sample(self.movement_keys,
+                    self.random.randint(0, 2)))
+            keys += [(pygame.KEYUP, key) for key in self.held_keys - wanted]
+            keys += [(pygame.KEYDOWN, key) for key in wanted - self.held_keys]
+            self.held_keys = wanted
+
+        if self.random.random() < self.fire_chance:
+            keys.append((pygame.KEYDOWN, pygame.K_SPACE))
+        return keys
@@ -4,24 +4,20 @@ from pygame.sprite import Sprite
 
 class Bullet(Sprite):
     """A class to manage bullets fired from the ship."""
-    def __init__(self, ai_game):
+    # Rotated images and masks, keyed by ship angle.
+    rotations = {}
+
+    def __init__(self, ai_game, ship=None):
         super().__init__()
         self.screen = ai_game.screen
         self.settings = ai_game.settings
 
-        # Load the bullet image and rotate it to match the ship's angle.
-        try:
-            self.image = pygame.image.load('images/missile.png')
-        except FileNotFoundError:
-            self.image = pygame.Surface((self.settings.bullet_width, self.settings.bullet_height))
-            self.image.fill(self.settings.bullet_color)
-
-        self.angle = ai_game.ship.angle
-        self.image = pygame.transform.rotate(self.image, self.angle)
+        # Use the bullet image rotated to match the ship's angle.
+        ship = ship or ai_game.ship
+        self._set_angle(ship.angle)
         
         # Set the rect and its position.
-        self.rect = self.image.get_rect()
-        self.rect.center = ai_game.ship.rect.center
+        self.rect.center = ship.rect.center
     
         # Store the bullet's position and trajectory.
         angle_rad = math.radians(self.angle)
@@ -33,6 +29,38 @@ class Bullet(Sprite):
         self.x = float(self.rect.x)
         self.y = float(self.rect.y)
 
+    @classmethod
+    def restore(cls, ai_game, x, y, x_speed, y_speed, angle):
+        """Recreate a bullet from a saved game state."""
+        bullet = cls.__new__(cls)
+        Sprite.__init__(bullet)
+        bullet.screen = ai_game.screen
+        bullet.settings = ai_game.settings
+        bullet._set_angle(angle)
+        bullet.x, bullet.y = x, y
+        bullet.rect.x, bullet.rect.y = x, y
+        bullet.x_speed, bullet.y_speed = x_speed, y_speed
+        return bullet
+
+    def _set_angle(self, angle):
+        """Use the image and mask for angle and reset the rect."""
+        self.angle = angle
+        if angle not in Bullet.rotations:
+            Bullet.rotations[angle] = self._rotate_image(angle)
+        self.image, self.mask = Bullet.rotations[angle]
+        self.rect = self.image.get_rect()
+
+    def _rotate_image(self, angle):
+        """Load the bullet image, rotate it, and build its mask."""
+        try:
+            image = pygame.image.load('images/missile.png')
+        except FileNotFoundError:
+            image = pygame.Surface((self.settings.bullet_width, self.settings.bullet_height))
+            image.fill(self.settings.bullet_color)
+
+        image = pygame.transform.rotate(image, angle)
+        return image, pygame.mask.from_surface(image)
+
     def update(self):
         """Move the bullet in the direction it was fired."""
         self.x += self.x_speed
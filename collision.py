@@ -0,0 +1,14 @@
+def collide_pixels(left, right):
+    """Return True if two sprites overlap on any opaque pixel.
+
+    Rects are checked first so the mask test only runs for the few pairs
+    that actually touch. Sprites whose drawn image is not aligned with
+    their rect (the rotated ship) can provide a mask_rect to test against.
+    """
+    left_rect = getattr(left, 'mask_rect', left.rect)
+    right_rect = getattr(right, 'mask_rect', right.rect)
+    if not left_rect.colliderect(right_rect):
+        return False
+
+    offset = (right_rect.x - left_rect.x, right_rect.y - left_rect.y)
+    return left.mask.overlap(right.mask, offset) is not None
@@ -0,0 +1,238 @@
+import multiprocessing
+import os
+import queue
+
+import pygame
+
+def _write_frames(ring, frame_size, size, masks, output_dir, output_format,
+        raw_path, pending, returned):
+    """Write frames queued in the shared ring until told to stop.
+
+    This runs in its own process, so encoding never holds the game's GIL.
+    Each frame's result goes on returned, followed by None once the
+    writer is done.
+    """
+    ring = memoryview(ring).cast('B')
+    # Frames are copied into a surface laid out like the screen, with no
+    # alpha mask, so the unused fourth byte doesn't make them transparent.
+    image = pygame.Surface(size, 0, 32, masks) if masks else None
+    raw_file = open(raw_path, 'ab') if raw_path else None
+    try:
+        while True:
+            item = pending.get()
+            if item is None:
+                break
+            frame_number, index = item
+            buffer = ring[index * frame_size:(index + 1) * frame_size]
+            try:
+                _write_frame(buffer, frame_number, size, image, output_dir,
+                        output_format, raw_file)
+                written = True
+            except (OSError, pygame.error):
+                written = False
+            buffer.release()
+            returned.put((index, written))
+    finally:
+        if raw_file:
+            raw_file.close()
+        returned.put(None)
+
+def _write_frame(buffer, frame_number, size, image, output_dir, output_format, raw_file):
+    """Write a single frame as an image file or onto the raw stream."""
+    if raw_file:
+        raw_file.write(buffer)
+        return
+    if image:
+        with memoryview(image.get_view('0')) as pixels:
+            pixels[:] = buffer
+    else:
+        image = pygame.image.frombuffer(buffer, size, 'RGB')
+    path = os.path.join(output_dir, f"frame_{frame_number:08d}.{output_format}")
+    pygame.image.save(image, path)
+
+class FrameCapture:
+    """A class to copy presented frames out and write them in the background.
+
+    Frames are copied into a ring of buffers in shared memory and a
+    separate writer process encodes them, so even PNG encoding costs the
+    game loop nothing but the copy.
+    """
+
+    def __init__(self, ai_game):
+        """Initialize the capture settings and the writer process state."""
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+        self.telemetry = ai_game.telemetry
+
+        self.width, self.height = self.screen.get_size()
+        self.every_n = max(1, self.settings.capture_every_n)
+        self.output_dir = self.settings.capture_dir
+        self.output_format = self.settings.capture_format
+
+        # Copy straight out of the surface's pixel buffer when it is packed
+        # 32-bit RGB; otherwise fall back to tobytes().
+        self.pixel_format = self._get_pixel_format()
+        if self.pixel_format:
+            self.masks = self.screen.get_masks()[:3] + (0,)
+            self.frame_size = self.screen.get_pitch() * self.height
+        else:
+            self.pixel_format = 'RGB'
+            self.masks = None
+            self.frame_size = self.width * self.height * 3
+        self.buffer_count = max(2, self.settings.capture_buffers)
+
+        # Frame accounting.
+        self.frame_count = 0
+        self.frames_captured = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+
+        # The ring and queues of the running writer. Indices of buffers
+        # that are free to be filled live in free_buffers.
+        self.active = False
+        self.ring = None
+        self.free_buffers = []
+        self.pending = None
+        self.returned = None
+        self.worker = None
+        # Writers told to stop that may still be finishing their queue, as
+        # (worker, returned, shared, pending). The ring and pending queue
+        # are kept alive until the writer is done with them.
+        self.shared = None
+        self.stopping = []
+
+    def _get_pixel_format(self):
+        """Return the byte order of a packed 32-bit screen, or None.
+
+        The fourth byte is unused padding, not alpha.
+        """
+        if self.screen.get_bytesize() != 4:
+            return None
+        if self.screen.get_pitch() != self.width * 4:
+            return None
+        masks = self.screen.get_masks()[:3]
+        if masks == (0xff0000, 0xff00, 0xff):
+            return 'BGRX'
+        if masks == (0xff, 0xff00, 0xff0000):
+            return 'RGBX'
+        return None
+
+    def start(self):
+        """Start a writer process and begin capturing frames."""
+        if self.active:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        raw_path = None
+        if self.output_format == 'raw':
+            raw_path = os.path.join(self.output_dir,
+                    f"capture_{self.width}x{self.height}_{self.pixel_format}.raw")
+        # Count what earlier writers have finished before their queues go.
+        self.stopping = [writer for writer in self.stopping
+                if not self._collect_returned(writer[1]) and writer[0].is_alive()]
+
+        # Spawn rather than fork, so the writer doesn't inherit SDL's state.
+        context = multiprocessing.get_context('spawn')
+        self.shared = context.RawArray('B', self.buffer_count * self.frame_size)
+        self.ring = memoryview(self.shared).cast('B')
+        self.free_buffers = list(range(self.buffer_count))
+        self.pending = context.Queue()
+        self.returned = context.Queue()
+        self.worker = context.Process(target=_write_frames, daemon=True,
+                args=(self.shared, self.frame_size, (self.width, self.height),
+                    self.masks, self.output_dir, self.output_format, raw_path,
+                    self.pending, self.returned))
+        self.worker.start()
+        self.active = True
+
+    def stop(self):
+        """Stop capturing; the writer finishes its queue in the background."""
+        if not self.active:
+            return
+        self.active = False
+        self.pending.put(None)
+        self._collect_returned(self.returned)
+        self.stopping.append((self.worker, self.returned, self.shared, self.pending))
+        self.worker = None
+        self.returned = None
+        self.shared = None
+        self.pending = None
+        self.ring.release()
+        self.ring = None
+        self._report()
+
+    def close(self):
+        """Stop capturing and wait for every queued frame to be written."""
+        self.stop()
+        if not self.stopping:
+            return
+        for worker, returned, _, _ in self.stopping:
+            while not self._collect_returned(returned, timeout=0.1):
+                if not worker.is_alive():
+                    # The writer died without finishing its queue.
+                    self._collect_returned(returned)
+                    break
+            worker.join()
+        self.stopping.clear()
+        self._report()
+
+    def _report(self):
+        """Emit the frame counts so far as a telemetry event."""
+        self.telemetry.emit('capture', self.frames_captured, self.frames_written,
+                self.frames_dropped)
+
+    def toggle(self):
+        """Start capturing if stopped, or stop if capturing."""
+        if self.active:
+            self.stop()
+        else:
+            self.start()
+
+    def _collect_returned(self, returned, timeout=0):
+        """Count the frames a writer has finished with.
+
+        Buffers of the running writer are taken back. Return True once
+        the writer has sent its last result.
+        """
+        while True:
+            try:
+                result = returned.get(timeout=timeout) if timeout else returned.get_nowait()
+            except queue.Empty:
+                return False
+            if result is None:
+                return True
+            index, written = result
+            if returned is self.returned:
+                self.free_buffers.append(index)
+            if written:
+                self.frames_written += 1
+            else:
+                self.frames_dropped += 1
+
+    def capture_frame(self):
+        """Copy the current frame into a free buffer and queue it."""
+        if not self.active:
+            return
+        self.frame_count += 1
+        if self.frame_count % self.every_n:
+            return
+
+        # Never wait on the writer; drop the frame if it has fallen behind.
+        if not self.free_buffers:
+            self._collect_returned(self.returned)
+            if not self.free_buffers:
+                self.frames_dropped += 1
+                return
+        index = self.free_buffers.pop()
+
+        start = index * self.frame_size
+        buffer = self.ring[start:start + self.frame_size]
+        if self.pixel_format == 'RGB':
+            buffer[:] = pygame.image.tobytes(self.screen, 'RGB')
+        else:
+            view = self.screen.get_view('0')
+            buffer[:] = view
+            del view
+        buffer.release()
+
+        self.pending.put((self.frame_count, index))
+        self.frames_captured += 1
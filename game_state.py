@@ -0,0 +1,246 @@
+import os
+import struct
+import zlib
+
+import pygame
+
+from alien import Alien
+from bullet import Bullet
+from alien_bullet import AlienBullet
+from powerup import PowerUp
+from waves import FireSchedule
+
+# Bump when the layout below changes so old saves are rejected.
+STATE_VERSION = 4
+
+# Version, level, game flags, score, ships left, fleet direction,
+# bullet width, power-up age in ms (or -1), wave tick, then the number
+# of aliens, bullets, partner bullets, alien bullets and power-ups that
+# follow. Explosion particles are only for show and are not kept.
+HEADER = struct.Struct('<BBBIbbHiIHHHHH')
+# Ship x, y, angle, visible, invulnerable age in ms (or -1). A co-op
+# game has a second one for the partner's ship.
+SHIP = struct.Struct('<ffH?i')
+# Alien x, y, rect y, speed x, speed y, has power-up, home x, home y,
+# path phase.
+ALIEN = struct.Struct('<ffhff?hhH')
+# Bullet x, y, speed x, speed y, angle (or rotation for alien bullets).
+BULLET = struct.Struct('<ffffH')
+# Power-up rect x and y.
+POWERUP = struct.Struct('<hf')
+
+FLAG_ACTIVE = 1
+FLAG_PAUSED = 2
+FLAG_PARTNER = 4
+
+def _pack_ship(ship, now):
+    """Pack a ship's position and state."""
+    invulnerable_age = now - ship.invulnerable_start_time if ship.invulnerable else -1
+    return SHIP.pack(ship.x, ship.y, ship.angle, ship.visible, invulnerable_age)
+
+def _restore_ship(ship, data, offset, now):
+    """Put a ship back as packed by _pack_ship() at offset in data."""
+    ship.x, ship.y, ship.angle, ship.visible, invulnerable_age = SHIP.unpack_from(data, offset)
+    ship.rect.x = ship.x
+    ship.rect.y = ship.y
+    ship.invulnerable = invulnerable_age >= 0
+    ship.invulnerable_start_time = now - max(0, invulnerable_age)
+
+def capture_state(ai_game):
+    """Pack the full state of a game into bytes."""
+    now = pygame.time.get_ticks()
+    settings = ai_game.settings
+
+    flags = ((FLAG_ACTIVE if ai_game.game_active else 0)
+            | (FLAG_PAUSED if ai_game.paused else 0)
+            | (FLAG_PARTNER if ai_game.partner else 0))
+    powerup_age = now - ai_game.powerup_start_time if ai_game.powerup_active else -1
+
+    parts = [
+        HEADER.pack(STATE_VERSION, ai_game.selected_level, flags,
+                ai_game.stats.score, ai_game.stats.ships_left,
+                settings.fleet_direction, settings.bullet_width, powerup_age,
+                ai_game.fleet_tick, len(ai_game.aliens), len(ai_game.bullets),
+                len(ai_game.partner_bullets), len(ai_game.alien_bullets),
+                len(ai_game.powerups)),
+        _pack_ship(ai_game.ship, now),
+    ]
+    if ai_game.partner:
+        parts.append(_pack_ship(ai_game.partner, now))
+    parts += [ALIEN.pack(alien.x, alien.y, alien.rect.y, getattr(alien, 'speed_x', 0.0),
+            getattr(alien, 'speed_y', 0.0), alien.has_powerup, alien.home_x, alien.home_y,
+            alien.phase)
+            for alien in ai_game.aliens]
+    parts += [BULLET.pack(bullet.x, bullet.y, bullet.x_speed, bullet.y_speed, bullet.angle)
+            for bullets in (ai_game.bullets, ai_game.partner_bullets) for bullet in bullets]
+    parts += [BULLET.pack(bullet.x, bullet.y, bullet.x_speed, bullet.y_speed, bullet.rotation)
+            for bullet in ai_game.alien_bullets]
+    parts += [POWERUP.pack(powerup.rect.x, powerup.y) for powerup in ai_game.powerups]
+    return b''.join(parts)
+
+def restore_state(ai_game, data):
+    """Replace the state of a game with one packed by capture_state().
+
+    Raise ValueError if data is not a state this version can read.
+    """
+    if len(data) < HEADER.size or data[0] != STATE_VERSION:
+        raise ValueError("Not a saved game state for this version.")
+    (_, level, flags, score, ships_left, fleet_direction, bullet_width, powerup_age,
+            fleet_tick, aliens, bullets, partner_bullets, alien_bullets,
+            powerups) = HEADER.unpack_from(data)
+    ships = 2 if flags & FLAG_PARTNER else 1
+    expected = (HEADER.size + ships * SHIP.size + aliens * ALIEN.size
+            + (bullets + partner_bullets + alien_bullets) * BULLET.size
+            + powerups * POWERUP.size)
+    if len(data) != expected:
+        raise ValueError("Saved game state is truncated or corrupt.")
+
+    now = pygame.time.get_ticks()
+    settings = ai_game.settings
+    if not 1 <= level <= len(ai_game.waves):
+        raise ValueError("Saved game state is for a level that no longer exists.")
+    if level != ai_game.selected_level or not ai_game.fire_schedule:
+        ai_game.fire_schedule = FireSchedule(ai_game.waves[level - 1].fire_rate,
+                settings.frame_rate)
+    ai_game.selected_level = level
+    # Restart firing from the restored clock, which may have gone back.
+    ai_game.fleet_tick = fleet_tick
+    ai_game.fire_schedule.rebase(fleet_tick)
+    ai_game.first_game = False
+    ai_game.game_active = bool(flags & FLAG_ACTIVE)
+    ai_game.paused = bool(flags & FLAG_PAUSED)
+    ai_game.stats.score = score
+    ai_game.stats.ships_left = ships_left
+    ai_game.sb.prep_score()
+    settings.fleet_direction = fleet_direction
+    settings.bullet_width = bullet_width
+    ai_game.powerup_active = powerup_age >= 0
+    ai_game.powerup_start_time = now - max(0, powerup_age)
+
+    # A saved partner is skipped in a game without one; a partner that
+    # wasn't saved keeps its ship where it is.
+    offset = HEADER.size
+    _restore_ship(ai_game.ship, data, offset, now)
+    offset += SHIP.size
+    if ships == 2:
+        if ai_game.partner:
+            _restore_ship(ai_game.partner, data, offset, now)
+        offset += SHIP.size
+
+    ai_game.aliens.empty()
+    end = offset + aliens * ALIEN.size
+    for (x, y, rect_y, speed_x, speed_y, has_powerup, home_x, home_y,
+            phase) in ALIEN.iter_unpack(data[offset:end]):
+        alien = Alien(ai_game)
+        alien.x, alien.y = x, y
+        alien.rect.x, alien.rect.y = x, rect_y
+        alien.speed_x, alien.speed_y = speed_x, speed_y
+        alien.has_powerup = has_powerup
+        alien.home_x, alien.home_y = home_x, home_y
+        alien.phase = phase
+        ai_game.aliens.add(alien)
+    ai_game.fleet = ai_game.aliens.sprites()
+    offset = end
+
+    ai_game.bullets.empty()
+    end = offset + bullets * BULLET.size
+    ai_game.bullets.add(Bullet.restore(ai_game, *fields)
+            for fields in BULLET.iter_unpack(data[offset:end]))
+    offset = end
+
+    ai_game.partner_bullets.empty()
+    end = offset + partner_bullets * BULLET.size
+    if ai_game.partner:
+        ai_game.partner_bullets.add(Bullet.restore(ai_game, *fields)
+                for fields in BULLET.iter_unpack(data[offset:end]))
+    offset = end
+
+    ai_game.alien_bullets.empty()
+    end = offset + alien_bullets * BULLET.size
+    ai_game.alien_bullets.add(AlienBullet.restore(ai_game, *fields)
+            for fields in BULLET.iter_unpack(data[offset:end]))
+    offset = end
+
+    ai_game.powerups.empty()
+    end = offset + powerups * POWERUP.size
+    for x, y in POWERUP.iter_unpack(data[offset:end]):
+        powerup = PowerUp(ai_game, (0, 0))
+        powerup.rect.x = x
+        powerup.y = y
+        powerup.rect.y = y
+        ai_game.powerups.add(powerup)
+
+    ai_game.particles.empty()
+
+def save_state(path, data):
+    """Write a state to path without ever leaving a half-written file."""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+def load_state(path):
+    """Read a state written by save_state(), or None if there is none."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def _xor(a, b):
+    """XOR two byte strings, padding the shorter one with zeros."""
+    size = max(len(a), len(b))
+    return (int.from_bytes(a, 'little') ^ int.from_bytes(b, 'little')).to_bytes(size, 'little')
+
+class RewindBuffer:
+    """A class to keep the last few seconds of game states.
+
+    Every keyframe_interval states one is kept whole; the others are kept
+    as a compressed XOR against that keyframe, which is mostly zeros.
+    """
+
+    def __init__(self, capacity, keyframe_interval):
+        """Create an empty ring of capacity states."""
+        self.capacity = capacity
+        self.keyframe_interval = keyframe_interval
+        self.entries = [None] * capacity
+        self.newest = -1
+        self.count = 0
+        self.keyframe = None
+        self.since_keyframe = 0
+
+    def push(self, state):
+        """Add a state, dropping the oldest one if the ring is full."""
+        if self.keyframe is None or self.since_keyframe >= self.keyframe_interval:
+            self.keyframe = state
+            self.since_keyframe = 0
+            entry = (state, None, len(state))
+        else:
+            delta = zlib.compress(_xor(state, self.keyframe), 1)
+            entry = (self.keyframe, delta, len(state))
+        self.since_keyframe += 1
+
+        self.newest = (self.newest + 1) % self.capacity
+        self.entries[self.newest] = entry
+        self.count = min(self.count + 1, self.capacity)
+
+    def pop(self):
+        """Remove and return the newest state, or None if there are none."""
+        if not self.count:
+            return None
+        keyframe, delta, size = self.entries[self.newest]
+        self.entries[self.newest] = None
+        self.newest = (self.newest - 1) % self.capacity
+        self.count -= 1
+
+        # Start a fresh keyframe once play carries on from here.
+        self.keyframe = None
+        if delta is None:
+            return keyframe
+        return _xor(keyframe, zlib.decompress(delta))[:size]
+
+    def clear(self):
+        """Forget every state."""
+        self.entries = [None] * self.capacity
+        self.count = 0
+        self.keyframe = None
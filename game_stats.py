@@ -9,7 +9,7 @@ class GameStats:
         # High score should never be reset.
         self.high_score = 0
         try:
-            with open('high_score.txt', 'r') as f:
+            with open(self.settings.high_score_file, 'r') as f:
                 content = f.read()
                 self.high_score = int(content) if content else 0
         except (FileNotFoundError, ValueError):
@@ -0,0 +1,161 @@
+import bisect
+import time
+
+import pygame
+
+class LatencyHistogram:
+    """A class to count latencies in fixed millisecond buckets."""
+
+    # Upper bounds of each bucket in milliseconds; one more bucket holds
+    # everything past the last bound.
+    bounds = (0.5, 1, 2, 4, 8, 12, 16.7, 25, 33.3, 50, 75, 100, 200)
+
+    def __init__(self, name):
+        """Initialize an empty histogram."""
+        self.name = name
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        """Count one latency, given in seconds."""
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total += ms
+
+    def percentile(self, fraction):
+        """Return the bucket bound at or below which fraction of samples fall.
+
+        Samples past the last bound give a label such as '>200', and an
+        empty histogram gives None.
+        """
+        if not self.count:
+            return None
+        wanted = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= wanted:
+                return bound
+        return f">{self.bounds[-1]}"
+
+    def report(self):
+        """Return a one-line summary of the histogram."""
+        if not self.count:
+            return f"{self.name}: no samples"
+        return (f"{self.name}: {self.count} events, mean {self.total / self.count:.2f} ms, "
+                f"p50 {self._describe(0.5)} ms, p95 {self._describe(0.95)} ms, "
+                f"p99 {self._describe(0.99)} ms")
+
+    def _describe(self, fraction):
+        """Return a percentile as text, e.g. '<= 16.7' or '>200'."""
+        bound = self.percentile(fraction)
+        if isinstance(bound, str):
+            return bound
+        return f"<= {bound}"
+
+class InputHandler:
+    """A class to collect input events and measure how long they take to act.
+
+    Events are collected in 1 ms slices while waiting for the next frame,
+    so each is stamped close to when it really arrived. Key events are
+    then timed to the simulation step that acts on them (input-to-update)
+    and to the flip that shows it (input-to-present).
+    """
+
+    # Keys whose held state moves the ship.
+    movement_keys = {
+        pygame.K_LEFT: 'moving_left',
+        pygame.K_RIGHT: 'moving_right',
+        pygame.K_UP: 'moving_up',
+        pygame.K_DOWN: 'moving_down',
+    }
+
+    def __init__(self, ai_game):
+        """Initialize the event queue and latency histograms."""
+        self.settings = ai_game.settings
+
+        self.frame_start = time.perf_counter()
+        self.pending = []
+        self.unapplied = []
+        self.unpresented = []
+        self.update_latency = LatencyHistogram('input-to-update')
+        self.present_latency = LatencyHistogram('input-to-present')
+
+    def collect(self):
+        """Stamp and queue every event pygame has waiting."""
+        now = time.perf_counter()
+        self.pending += [(now, event) for event in pygame.event.get()]
+
+    def take_events(self):
+        """Return all queued events, oldest first."""
+        self.collect()
+        events = []
+        for arrival, event in self.pending:
+            events.append(event)
+            # Key events already timed by latch() have no arrival left.
+            if arrival is not None and event.type in (pygame.KEYDOWN, pygame.KEYUP):
+                self.unapplied.append(arrival)
+        self.pending.clear()
+        return events
+
+    def sync_held_keys(self, ship):
+        """Set the ship's movement flags from the keys held right now.
+
+        This recovers from a KEYUP that never arrived (e.g. the window
+        lost focus while a key was held).
+        """
+        pressed = pygame.key.get_pressed()
+        for key, flag in self.movement_keys.items():
+            setattr(ship, flag, pressed[key])
+
+    def latch(self, ship):
+        """Collect waiting events and move the ship by the keys held now.
+
+        Only movement is applied here; every event stays queued for the
+        next take_events(), which won't time the movement keys again.
+        """
+        self.collect()
+        self.sync_held_keys(ship)
+        now = time.perf_counter()
+        for index, (arrival, event) in enumerate(self.pending):
+            if (arrival is not None and event.type in (pygame.KEYDOWN, pygame.KEYUP)
+                    and event.key in self.movement_keys):
+                self.update_latency.add(now - arrival)
+                self.unpresented.append(arrival)
+                self.pending[index] = (None, event)
+
+    def mark_updated(self):
+        """Record that the simulation has now acted on the taken events."""
+        now = time.perf_counter()
+        for arrival in self.unapplied:
+            self.update_latency.add(now - arrival)
+        self.unpresented += self.unapplied
+        self.unapplied.clear()
+
+    def mark_presented(self):
+        """Record that the frame showing the taken events was flipped."""
+        now = time.perf_counter()
+        for arrival in self.unpresented:
+            self.present_latency.add(now - arrival)
+        self.unpresented.clear()
+
+    def wait_for_frame(self, clock, frame_rate):
+        """Wait out the rest of the frame, collecting events as they arrive."""
+        if not frame_rate:
+            clock.tick()
+            return
+        frame_end = self.frame_start + 1 / frame_rate
+        while time.perf_counter() < frame_end:
+            self.collect()
+            time.sleep(0.001)
+        clock.tick()
+
+    def start_frame(self):
+        """Note when the frame began, for wait_for_frame()."""
+        self.frame_start = time.perf_counter()
+
+    def report(self):
+        """Return the latency summaries as a list of lines."""
+        return [self.update_latency.report(), self.present_latency.report()]
@@ -0,0 +1,180 @@
+"""Run a co-op host and partner as two headless processes over loopback.
+
+Checks that the partner places every alien where the host has it, and
+reports the snapshot size and capture cost for each level.
+
+Usage: python netcheck.py [--frames 600] [--spacing 2]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Run without a window or sound device.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+# The game loads its images and sounds relative to its own directory.
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+from settings import Settings
+from alien_invasion import AlienInvasion
+from autopilot import Autopilot
+from netplay import NetClient, MAX_PACKET, KEY_LEFT, KEY_RIGHT, KEY_UP, KEY_DOWN
+
+# Snapshots whose alien positions are compared (every nth seq).
+COMPARE_EVERY = 5
+
+def run_host(args, results, done):
+    """Play every level as the host and report what was sent."""
+    settings = Settings()
+    settings.ship_hit_delay = 0
+    settings.telemetry_enabled = False
+    settings.input_poll_held_keys = False
+    settings.input_latency_report = False
+    settings.checkpoint_seconds = 0
+    settings.high_score_file = os.path.join(tempfile.gettempdir(),
+            'alien_invasion_netcheck_high_score.txt')
+    random.seed(args.seed)
+    game = AlienInvasion(settings)
+    if args.spacing:
+        for wave in game.waves:
+            wave.x_spacing = wave.y_spacing = args.spacing
+    game.start_hosting(args.port)
+    host = game.net_host
+    autopilot = Autopilot(game, seed=args.seed, pause_chance=0, quit_chance=0)
+
+    # Time each snapshot and note its size and the level it was for.
+    sends = []
+    send_snapshot = host.send_snapshot
+    def timed_send_snapshot():
+        seq, sent = host.seq, host.bytes_sent
+        start = time.perf_counter()
+        send_snapshot()
+        if host.seq != seq:
+            sends.append((game.selected_level, len(game.aliens), host.bytes_sent - sent,
+                    time.perf_counter() - start))
+    host.send_snapshot = timed_send_snapshot
+
+    truth = {}
+    for level in range(1, len(game.waves) + 1):
+        game.first_game = True
+        game.game_active = False
+        autopilot.next_level = level
+        while not game.game_active:
+            autopilot.post_events()
+            game._run_frame()
+        for _ in range(args.frames):
+            autopilot.post_events()
+            game._run_frame()
+            if host.seq % COMPARE_EVERY == 0 and host.seq not in truth:
+                truth[host.seq] = {net_id: alien.rect.topleft
+                        for alien, net_id in host.alien_ids.items()}
+            game.clock.tick(game.settings.frame_rate)
+    done.set()
+    results.put(('host', sends, truth, host.largest_packet))
+
+def run_partner(args, results, done):
+    """Play as the partner with random keys and note where aliens were put."""
+    partner = NetClient('127.0.0.1', args.port)
+    keys = random.Random(args.seed)
+    placed = {}
+    seq = 0
+    while not done.is_set():
+        if keys.random() < 0.05:
+            bits = keys.choice((0, KEY_LEFT, KEY_RIGHT, KEY_UP, KEY_DOWN))
+            partner.ship.moving_left = bool(bits & KEY_LEFT)
+            partner.ship.moving_right = bool(bits & KEY_RIGHT)
+            partner.ship.moving_up = bool(bits & KEY_UP)
+            partner.ship.moving_down = bool(bits & KEY_DOWN)
+        if keys.random() < 0.1:
+            partner.fire_count = (partner.fire_count + 1) % 256
+        partner._send_input()
+        partner._receive_snapshots()
+        if partner.latest_seq != seq:
+            seq = partner.latest_seq
+            if seq % COMPARE_EVERY == 0:
+                partner._place_aliens(1.0)
+                placed[seq] = {net_id: alien.rect.topleft
+                        for net_id, alien in partner.fleet.items()}
+        partner._predict_ship()
+        partner.particles.update()
+        partner._update_screen()
+        partner.clock.tick(partner.settings.frame_rate)
+    results.put(('partner', placed))
+
+def compare(truth, placed):
+    """Return (compared, missing, max error) of placed against truth per seq."""
+    compared = missing = 0
+    errors = {}
+    for seq, aliens in placed.items():
+        expected = truth.get(seq)
+        if expected is None:
+            continue
+        worst = 0
+        for net_id, (x, y) in expected.items():
+            if net_id not in aliens:
+                missing += 1
+                continue
+            px, py = aliens[net_id]
+            worst = max(worst, abs(px - x), abs(py - y))
+            compared += 1
+        errors[seq] = worst
+    return compared, missing, errors
+
+def main(argv=None):
+    """Run the check and return a process exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=600,
+            help="frames played on each level")
+    parser.add_argument('--spacing', type=int, default=0,
+            help="alien spacing for every wave, to try bigger fleets")
+    parser.add_argument('--tolerance', type=int, default=3,
+            help="pixels the partner's aliens may be off by")
+    parser.add_argument('--port', type=int, default=Settings().net_port + 1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    done = context.Event()
+    host = context.Process(target=run_host, args=(args, results, done))
+    partner = context.Process(target=run_partner, args=(args, results, done))
+    host.start()
+    partner.start()
+    reports = dict((report[0], report[1:]) for report in (results.get(), results.get()))
+    host.join()
+    partner.join()
+
+    sends, truth, largest = reports['host']
+    (placed,) = reports['partner']
+    compared, missing, errors = compare(truth, placed)
+    print(f"{'level':>5} {'aliens':>6} {'snapshots':>9} {'mean B':>7} {'max B':>6} "
+            f"{'mean us':>8}")
+    for level in sorted({send[0] for send in sends}):
+        level_sends = [send for send in sends if send[0] == level]
+        print(f"{level:>5} {max(send[1] for send in level_sends):>6} {len(level_sends):>9} "
+                f"{statistics.mean(send[2] for send in level_sends):>7.0f} "
+                f"{max(send[2] for send in level_sends):>6} "
+                f"{1e6 * statistics.mean(send[3] for send in level_sends):>8.1f}")
+    worst = max(errors.values(), default=0)
+    print(f"Compared {compared} alien positions in {len(errors)} snapshots; "
+            f"{missing} not yet sent; worst error {worst} px.")
+
+    problems = []
+    if largest > MAX_PACKET:
+        problems.append(f"a {largest}-byte snapshot is over {MAX_PACKET} bytes")
+    if not compared:
+        problems.append("no snapshots reached the partner")
+    if worst > args.tolerance:
+        problems.append(f"aliens were up to {worst} px from the host's")
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    return 1 if problems else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,622 @@
+import socket
+import struct
+import sys
+import time
+
+import pygame
+
+from settings import Settings
+from ship import Ship
+from star import Star
+from alien import Alien
+from particles import ParticleSystem
+from waves import load_waves
+
+# Packet types.
+PACKET_INPUT = 1
+PACKET_SNAPSHOT = 2
+
+# Entity kinds. The host's ship always has net id 0 and the partner's 1.
+KIND_SHIP = 0
+KIND_BULLET = 2
+KIND_ALIEN_BULLET = 3
+KIND_POWERUP = 4
+HOST_SHIP_ID = 0
+PARTNER_SHIP_ID = 1
+
+# Alien kinds. Only free aliens (those chasing a ship) are sent wherever
+# they are; the others are sent once, when they appear, and the partner
+# works out where they are from the fleet's tick and march offset:
+#   KIND_ALIEN: top left x, y.
+#   KIND_MARCHER: home x, y; it sits at home plus the march offset.
+#   KIND_PATH_ALIEN: home x, y and path phase; it follows the wave's path.
+#   KIND_BOUNCER: x, y at a tick, and the tick and speed signs packed by
+#   bouncer_extra().
+#
+# Free aliens are the limit of this scheme. Each steers at the host's ship
+# as it is on every tick, which the partner never sees exactly, so their
+# records change every tick and a chase wave's snapshots grow with its
+# fleet. Once they pass MAX_PACKET the aliens are sent in turns, and each
+# is shown where it was up to changed // fits snapshots ago.
+KIND_ALIEN = 1
+KIND_MARCHER = 5
+KIND_PATH_ALIEN = 6
+KIND_BOUNCER = 7
+ALIEN_KINDS = (KIND_ALIEN, KIND_MARCHER, KIND_PATH_ALIEN, KIND_BOUNCER)
+
+# Bouncer ticks are sent modulo this, so a bouncer's record must reach
+# the partner within this many ticks of being made.
+BOUNCE_TICKS = 8192
+
+# Game state flags.
+FLAG_ACTIVE = 1
+FLAG_PAUSED = 2
+FLAG_MENU = 4
+
+# Partner key bits.
+KEY_LEFT = 1
+KEY_RIGHT = 2
+KEY_UP = 4
+KEY_DOWN = 8
+
+# Input: type, acked snapshot seq, key bits, fire press counter.
+INPUT = struct.Struct('!BHBB')
+# Snapshot: type, seq, baseline seq (0 for a full snapshot), score,
+# ships left, level, flags, fleet tick, march offset x and y, changed
+# record count, removed id count.
+SNAPSHOT_HEADER = struct.Struct('!BHHIBBBIhhHH')
+# Entity record: net id, kind, x, y, extra. Ships, bullets and power-ups
+# send their center and angle (-1 if hidden); aliens are described above.
+RECORD = struct.Struct('!HBhhh')
+REMOVED = struct.Struct('!H')
+
+# Largest UDP payload that fits a 1500-byte Ethernet frame unfragmented.
+MAX_PACKET = 1472
+
+# Snapshots kept on each side as delta baselines.
+HISTORY_SIZE = 64
+
+def next_seq(seq):
+    """Return the sequence number after seq, skipping 0."""
+    return seq % 65535 + 1
+
+def is_newer(seq, than):
+    """Return True if seq comes after than, allowing for wraparound."""
+    return 0 < (seq - than) % 65535 < 32768
+
+def bouncer_extra(tick, speed_x, speed_y):
+    """Pack a bouncer's tick and speed signs into a record's extra field."""
+    return (tick % BOUNCE_TICKS) << 2 | (speed_x > 0) | (speed_y > 0) << 1
+
+def encode_snapshot(seq, state, baseline_seq=0, baseline=None):
+    """Pack state as a delta against baseline, or in full without one.
+
+    A state is a tuple of (score, ships_left, level, flags, fleet_tick,
+    march_x, march_y) and a dict of net id -> (kind, x, y, extra). Only
+    records that differ from the baseline are sent, followed by the ids
+    that have gone away.
+
+    Return the packet and the state the partner will have once it is
+    decoded. That is state itself unless the changes don't all fit in
+    MAX_PACKET, in which case the rest are left for later snapshots.
+    """
+    info, entities = state
+    old_entities = baseline[1] if baseline else {}
+    changed = entities.items() - old_entities.items()
+    removed = old_entities.keys() - entities.keys()
+
+    room = MAX_PACKET - SNAPSHOT_HEADER.size
+    if len(changed) * RECORD.size + len(removed) * REMOVED.size > room:
+        # Removals are smallest so go first. Then the ships, then the rest
+        # in turns, starting further on each snapshot so none is starved.
+        removed = sorted(removed)[:room // REMOVED.size]
+        room -= len(removed) * REMOVED.size
+        fits = room // RECORD.size
+        changed = sorted(changed)
+        ships = [item for item in changed[:2] if item[0] <= PARTNER_SHIP_ID]
+        others = changed[len(ships):]
+        start = seq * fits % len(others) if others else 0
+        changed = (ships + others[start:] + others[:start])[:fits]
+        entities = dict(old_entities)
+        for net_id in removed:
+            del entities[net_id]
+        entities.update(changed)
+        state = (info, entities)
+
+    parts = [SNAPSHOT_HEADER.pack(PACKET_SNAPSHOT, seq, baseline_seq, *info,
+            len(changed), len(removed))]
+    parts += [RECORD.pack(net_id, *record) for net_id, record in changed]
+    parts += [REMOVED.pack(net_id) for net_id in removed]
+    return b''.join(parts), state
+
+def decode_snapshot(data, baselines):
+    """Unpack a snapshot into (seq, state).
+
+    Return None if the packet is malformed or its baseline is not among
+    baselines, a dict of seq -> state.
+    """
+    if len(data) < SNAPSHOT_HEADER.size or data[0] != PACKET_SNAPSHOT:
+        return None
+    (_, seq, baseline_seq, *info, changed,
+            removed) = SNAPSHOT_HEADER.unpack_from(data)
+    records_end = SNAPSHOT_HEADER.size + changed * RECORD.size
+    if len(data) != records_end + removed * REMOVED.size:
+        return None
+
+    if baseline_seq:
+        baseline = baselines.get(baseline_seq)
+        if baseline is None:
+            return None
+        entities = dict(baseline[1])
+    else:
+        entities = {}
+
+    for net_id, kind, x, y, extra in RECORD.iter_unpack(data[SNAPSHOT_HEADER.size:records_end]):
+        entities[net_id] = (kind, x, y, extra)
+    for (net_id,) in REMOVED.iter_unpack(data[records_end:]):
+        entities.pop(net_id, None)
+    return seq, (tuple(info), entities)
+
+class NetHost:
+    """A class to run the authoritative game for a remote partner."""
+
+    def __init__(self, ai_game, port):
+        """Open the host socket and set up the snapshot history."""
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('', port))
+        self.sock.setblocking(False)
+        self.partner_address = None
+
+        self.seq = 0
+        self.acked_seq = 0
+        self.history = {}
+        self.fire_count = None
+        self.frame_count = 0
+        self.last_input_frame = 0
+        self.next_net_id = PARTNER_SHIP_ID + 1
+
+        # Net ids and records of the aliens, kept up to date as aliens
+        # appear and go so that a snapshot needn't visit every alien.
+        self.alien_ids = {}
+        self.alien_records = {}
+
+        # Traffic counters, for checking the bandwidth used.
+        self.packets_sent = 0
+        self.bytes_sent = 0
+        self.largest_packet = 0
+
+    def receive_inputs(self):
+        """Apply every input packet the partner has sent since last frame.
+
+        If none has come for net_input_timeout frames the partner's ship
+        stops, rather than drifting on the last keys held.
+        """
+        while True:
+            try:
+                data, address = self.sock.recvfrom(64)
+            except (BlockingIOError, ConnectionError):
+                break
+            if len(data) != INPUT.size or data[0] != PACKET_INPUT:
+                continue
+            self.partner_address = address
+            self.last_input_frame = self.frame_count
+            _, ack, keys, fire_count = INPUT.unpack(data)
+            if ack in self.history and (not self.acked_seq or is_newer(ack, self.acked_seq)):
+                self.acked_seq = ack
+            self._apply_input(keys, fire_count)
+
+        if (self.partner_address
+                and self.frame_count - self.last_input_frame > self.settings.net_input_timeout):
+            self._apply_input(0, self.fire_count)
+
+    def _apply_input(self, keys, fire_count):
+        """Steer the partner's ship and fire any new shots."""
+        game = self.ai_game
+        partner = game.partner
+        partner.moving_left = bool(keys & KEY_LEFT)
+        partner.moving_right = bool(keys & KEY_RIGHT)
+        partner.moving_up = bool(keys & KEY_UP)
+        partner.moving_down = bool(keys & KEY_DOWN)
+
+        # The counter goes up once per press, so lost packets lose no shots.
+        if self.fire_count is not None and game.game_active and not game.paused:
+            for _ in range((fire_count - self.fire_count) % 256):
+                game._fire_bullet(partner, game.partner_bullets)
+        self.fire_count = fire_count
+
+    def send_snapshot(self):
+        """Send the partner the current state, delta-compressed if possible."""
+        self.frame_count += 1
+        if not self.partner_address:
+            return
+        if self.frame_count % self.settings.net_snapshot_interval:
+            return
+
+        baseline = self.history.get(self.acked_seq)
+        baseline_seq = self.acked_seq if baseline else 0
+        state = self._capture_state(refresh=baseline is None)
+        self.seq = next_seq(self.seq)
+        packet, state = encode_snapshot(self.seq, state, baseline_seq, baseline)
+        self.packets_sent += 1
+        self.bytes_sent += len(packet)
+        self.largest_packet = max(self.largest_packet, len(packet))
+
+        self.history[self.seq] = state
+        if len(self.history) > HISTORY_SIZE:
+            del self.history[next(iter(self.history))]
+
+        try:
+            self.sock.sendto(packet, self.partner_address)
+        except OSError:
+            pass
+
+    def _new_net_id(self):
+        """Return an unused net id."""
+        net_id = self.next_net_id
+        self.next_net_id = self.next_net_id % 65535 + 1
+        if self.next_net_id <= PARTNER_SHIP_ID:
+            self.next_net_id = PARTNER_SHIP_ID + 1
+        return net_id
+
+    def _net_id(self, sprite):
+        """Return the sprite's net id, giving it one if it has none."""
+        net_id = getattr(sprite, 'net_id', None)
+        if net_id is None:
+            net_id = sprite.net_id = self._new_net_id()
+        return net_id
+
+    def _alien_record(self, alien):
+        """Return the record the partner needs to place alien from now on."""
+        if alien.pattern == 'chase':
+            return (KIND_ALIEN, alien.rect.x, alien.rect.y, 0)
+        if alien.pattern == 'march':
+            return (KIND_MARCHER, alien.home_x, alien.home_y, 0)
+        if alien.pattern == 'bounce':
+            return (KIND_BOUNCER, round(alien.x), round(alien.y),
+                    bouncer_extra(self.ai_game.fleet_tick, alien.speed_x, alien.speed_y))
+        return (KIND_PATH_ALIEN, alien.home_x, alien.home_y,
+                alien.phase % max(1, len(alien.path_x)))
+
+    def _update_alien_records(self, refresh):
+        """Add records for new aliens and drop those of aliens gone.
+
+        Set differences of the alien group against the known aliens find
+        both at C speed rather than in a Python loop. Only free aliens,
+        whose records change every tick, are all visited here; with
+        refresh, bouncers are too, so a partner starting afresh gets them
+        from where they are.
+        """
+        game = self.ai_game
+        aliens = game.aliens.spritedict
+        alien_ids = self.alien_ids
+        records = self.alien_records
+        for alien in alien_ids.keys() - aliens.keys():
+            del records[alien_ids.pop(alien)]
+        for alien in aliens.keys() - alien_ids.keys():
+            net_id = alien_ids[alien] = self._new_net_id()
+            records[net_id] = self._alien_record(alien)
+
+        pattern = game.wave.pattern
+        if pattern == 'chase' or (refresh and pattern == 'bounce'):
+            for alien, net_id in alien_ids.items():
+                records[net_id] = self._alien_record(alien)
+
+    def _march_offset(self):
+        """Return how far the marching fleet has moved from home."""
+        for alien in self.alien_ids:
+            if alien.pattern == 'march':
+                return alien.rect.x - alien.home_x, alien.rect.y - alien.home_y
+            break
+        return 0, 0
+
+    def _capture_state(self, refresh=False):
+        """Quantize everything the partner needs to draw into a state."""
+        game = self.ai_game
+        self._update_alien_records(refresh)
+        flags = ((FLAG_ACTIVE if game.game_active else 0)
+                | (FLAG_PAUSED if game.paused else 0)
+                | (FLAG_MENU if game.first_game else 0))
+        info = (game.stats.score, max(0, game.stats.ships_left),
+                game.selected_level, flags, game.fleet_tick, *self._march_offset())
+
+        # Copying the records and diffing them in encode_snapshot() still
+        # costs O(fleet) per snapshot, though only in C and without
+        # touching an alien sprite.
+        entities = dict(self.alien_records)
+        for net_id, ship in ((HOST_SHIP_ID, game.ship), (PARTNER_SHIP_ID, game.partner)):
+            entities[net_id] = (KIND_SHIP, *ship.rect.center,
+                    ship.angle if ship.visible else -1)
+        for bullets in (game.bullets, game.partner_bullets):
+            for bullet in bullets:
+                entities[self._net_id(bullet)] = (KIND_BULLET, *bullet.rect.center,
+                        bullet.angle)
+        for bullet in game.alien_bullets:
+            entities[self._net_id(bullet)] = (KIND_ALIEN_BULLET, *bullet.rect.center,
+                    bullet.rotation)
+        for powerup in game.powerups:
+            entities[self._net_id(powerup)] = (KIND_POWERUP, *powerup.rect.center, 0)
+        return info, entities
+
+    def close(self):
+        """Close the host socket."""
+        self.sock.close()
+
+class NetClient:
+    """A class to play as the partner in a game hosted elsewhere."""
+
+    def __init__(self, host, port):
+        """Open a window and a socket to the host."""
+        pygame.init()
+        self.clock = pygame.time.Clock()
+        self.settings = Settings()
+
+        self.screen = pygame.display.set_mode((self.settings.screen_width, self.settings.screen_height))
+        pygame.display.set_caption("Alien Invasion - Co-op")
+        self.font = pygame.font.SysFont(None, 48)
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.host_address = (host, port)
+
+        # Our own ship is predicted locally and corrected by the host.
+        self.ship = Ship(self)
+        self.fire_count = 0
+        self.stars = pygame.sprite.Group(Star(self) for _ in range(100))
+        self.particles = ParticleSystem(self)
+
+        # Aliens are placed locally from their records and the fleet's
+        # tick, so the waves are needed for their paths.
+        self.waves = load_waves(self.settings.waves_file)
+        self.selected_level = 1
+        self.fleet = {}
+
+        self.powerup_image = pygame.image.load('images/star.png')
+        self.missile_image = pygame.image.load('images/missile.png')
+        self.missile_rotations = {}
+
+        # Decoded states by seq, and the two being interpolated between.
+        self.states = {}
+        self.latest_seq = 0
+        self.previous = None
+        self.current = None
+        self.received_at = 0.0
+        self.snapshot_period = self.settings.net_snapshot_interval / self.settings.frame_rate
+
+        self.score = None
+        self.score_image = None
+
+    @property
+    def wave(self):
+        """Return the wave for the host's level."""
+        return self.waves[self.selected_level - 1]
+
+    def run(self):
+        """Start the main loop for the partner."""
+        while True:
+            self._check_events()
+            self._send_input()
+            self._receive_snapshots()
+            self._predict_ship()
+            self.stars.update()
+            self.particles.update()
+            self._update_screen()
+            self.clock.tick(self.settings.frame_rate)
+
+    def _check_events(self):
+        """Track movement keys and count shots fired."""
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                sys.exit()
+            elif event.type in (pygame.KEYDOWN, pygame.KEYUP):
+                pressed = event.type == pygame.KEYDOWN
+                if event.key == pygame.K_RIGHT:
+                    self.ship.moving_right = pressed
+                elif event.key == pygame.K_LEFT:
+                    self.ship.moving_left = pressed
+                elif event.key == pygame.K_UP:
+                    self.ship.moving_up = pressed
+                elif event.key == pygame.K_DOWN:
+                    self.ship.moving_down = pressed
+                elif event.key == pygame.K_SPACE and pressed:
+                    self.fire_count = (self.fire_count + 1) % 256
+                elif event.key == pygame.K_q and pressed:
+                    sys.exit()
+
+    def _send_input(self):
+        """Send our keys and the newest snapshot we have to the host."""
+        keys = ((KEY_LEFT if self.ship.moving_left else 0)
+                | (KEY_RIGHT if self.ship.moving_right else 0)
+                | (KEY_UP if self.ship.moving_up else 0)
+                | (KEY_DOWN if self.ship.moving_down else 0))
+        packet = INPUT.pack(PACKET_INPUT, self.latest_seq, keys, self.fire_count)
+        try:
+            self.sock.sendto(packet, self.host_address)
+        except OSError:
+            pass
+
+    def _receive_snapshots(self):
+        """Decode every snapshot that has arrived and keep the newest."""
+        while True:
+            try:
+                data, _ = self.sock.recvfrom(65535)
+            except (BlockingIOError, ConnectionError):
+                return
+            result = decode_snapshot(data, self.states)
+            if result is None:
+                continue
+            seq, state = result
+            self.states[seq] = state
+            if len(self.states) > HISTORY_SIZE:
+                del self.states[next(iter(self.states))]
+            if self.latest_seq and not is_newer(seq, self.latest_seq):
+                continue
+
+            self.latest_seq = seq
+            self.previous = self.current
+            self.current = state
+            self.received_at = time.perf_counter()
+            self._on_new_state()
+
+    def _on_new_state(self):
+        """Update the fleet, burst destroyed aliens and correct our ship."""
+        info, entities = self.current
+        self.selected_level = min(max(1, info[2]), len(self.waves))
+        tick = info[4]
+        # A fleet cleared with its tick restarted was replaced, not shot.
+        replaced = self.previous and tick < self.previous[0][4]
+        for net_id in self.fleet.keys() - entities.keys():
+            alien = self.fleet.pop(net_id)
+            if not replaced:
+                self.particles.spawn_burst(alien.rect.center)
+
+        old_entities = self.previous[1] if self.previous else {}
+        for net_id, record in entities.items() - old_entities.items():
+            if record[0] in ALIEN_KINDS:
+                self._set_alien(net_id, record, tick)
+
+        record = self.current[1].get(PARTNER_SHIP_ID)
+        if record is None:
+            return
+        _, x, y, angle = record
+        self.ship.visible = angle >= 0
+        dx = x - self.ship.rect.centerx
+        dy = y - self.ship.rect.centery
+        if abs(dx) + abs(dy) > self.settings.net_snap_distance:
+            # Too far off (e.g. a respawn): take the host's position.
+            self.ship.x += dx
+            self.ship.y += dy
+        else:
+            # Ease towards the host so small disagreements don't jitter.
+            self.ship.x += dx * 0.1
+            self.ship.y += dy * 0.1
+        self.ship.rect.x = self.ship.x
+        self.ship.rect.y = self.ship.y
+
+    def _set_alien(self, net_id, record, tick):
+        """Create or reset the alien drawn for a record."""
+        kind, x, y, extra = record
+        alien = self.fleet.get(net_id)
+        if alien is None:
+            alien = self.fleet[net_id] = Alien(self)
+        alien.kind = kind
+        alien.rect.x, alien.rect.y = x, y
+        if kind == KIND_BOUNCER:
+            alien.pattern = 'bounce'
+            alien.x, alien.y = float(x), float(y)
+            speed = self.settings.alien_speed
+            alien.speed_x = speed if extra & 1 else -speed
+            alien.speed_y = speed if extra & 2 else -speed
+            # The tick this position is for; it's stepped on from there.
+            alien.tick = tick - (tick - (extra >> 2)) % BOUNCE_TICKS
+        else:
+            alien.home_x, alien.home_y = x, y
+            alien.phase = extra
+
+    def _place_aliens(self, alpha):
+        """Move every alien to where it is alpha of the way to the newest state."""
+        info, entities = self.current
+        old_info, old_entities = self.previous or self.current
+        tick, march_x, march_y = info[4:7]
+        if tick >= old_info[4]:
+            tick = old_info[4] + round((tick - old_info[4]) * alpha)
+            march_x = old_info[5] + (march_x - old_info[5]) * alpha
+            march_y = old_info[6] + (march_y - old_info[6]) * alpha
+
+        for net_id, alien in self.fleet.items():
+            kind = alien.kind
+            if kind == KIND_MARCHER:
+                alien.rect.x = alien.home_x + march_x
+                alien.rect.y = alien.home_y + march_y
+            elif kind == KIND_PATH_ALIEN:
+                alien.update(tick)
+            elif kind == KIND_BOUNCER:
+                while alien.tick < tick:
+                    alien.update()
+                    alien.tick += 1
+            else:
+                _, x, y, _ = entities[net_id]
+                old = old_entities.get(net_id)
+                if old:
+                    x = old[1] + (x - old[1]) * alpha
+                    y = old[2] + (y - old[2]) * alpha
+                alien.rect.x, alien.rect.y = x, y
+
+    def _predict_ship(self):
+        """Move our ship straight away instead of waiting for the host."""
+        if self.current and self.current[0][3] & FLAG_ACTIVE and not self.current[0][3] & FLAG_PAUSED:
+            self.ship.update()
+
+    def _missile(self, angle):
+        """Return the missile image rotated by angle."""
+        image = self.missile_rotations.get(angle)
+        if image is None:
+            image = self.missile_rotations[angle] = pygame.transform.rotate(
+                    self.missile_image, angle)
+        return image
+
+    def _update_screen(self):
+        """Draw the interpolated state and flip to the new screen."""
+        self.screen.fill(self.settings.bg_color)
+        self.stars.draw(self.screen)
+
+        if not self.current or self.current[0][3] & FLAG_MENU:
+            self._draw_message("Waiting for the host to start...")
+        else:
+            self._draw_entities()
+            self.particles.draw()
+            self._draw_score()
+            flags = self.current[0][3]
+            if flags & FLAG_PAUSED:
+                self._draw_message("PAUSED")
+            elif not flags & FLAG_ACTIVE:
+                self._draw_message("GAME OVER! Waiting for the host to restart")
+
+        pygame.display.flip()
+
+    def _draw_entities(self):
+        """Draw every entity, interpolated between the last two states."""
+        alpha = min(1.0, (time.perf_counter() - self.received_at) / self.snapshot_period)
+        self._place_aliens(alpha)
+        blits = [(alien.image, alien.rect) for alien in self.fleet.values()]
+
+        old_entities = self.previous[1] if self.previous else {}
+        for net_id, (kind, x, y, extra) in self.current[1].items():
+            if net_id == PARTNER_SHIP_ID or kind in ALIEN_KINDS:
+                continue
+            old = old_entities.get(net_id)
+            if old:
+                x = old[1] + (x - old[1]) * alpha
+                y = old[2] + (y - old[2]) * alpha
+
+            if kind == KIND_POWERUP:
+                image = self.powerup_image
+            elif kind == KIND_SHIP:
+                if extra < 0:
+                    continue
+                image = self.ship.rotated_surfaces[extra]
+            else:
+                image = self._missile(extra)
+            blits.append((image, image.get_rect(center=(x, y))))
+        self.screen.blits(blits, doreturn=False)
+        self.ship.blitme()
+
+    def _draw_score(self):
+        """Draw the shared score, rendering it only when it changes."""
+        score = self.current[0][0]
+        if score != self.score:
+            self.score = score
+            self.score_image = self.font.render(str(score), True,
+                    (30, 30, 30), self.settings.bg_color)
+        score_rect = self.score_image.get_rect()
+        score_rect.right = self.screen.get_rect().right - 20
+        score_rect.top = 20
+        self.screen.blit(self.score_image, score_rect)
+
+    def _draw_message(self, msg):
+        """Draw a message in the middle of the screen."""
+        msg_image = self.font.render(msg, True, (255, 255, 255))
+        msg_rect = msg_image.get_rect(center=self.screen.get_rect().center)
+        self.screen.blit(msg_image, msg_rect)
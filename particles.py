@@ -0,0 +1,139 @@
+import math
+import random
+
+import pygame
+
+class ParticleSystem:
+    """A class to manage every explosion particle and flash in shared arrays."""
+
+    # Colors particles fade through, from hottest to coolest.
+    colors = [(255, 255, 200), (255, 210, 80), (255, 140, 30), (200, 60, 20), (90, 30, 20)]
+
+    def __init__(self, ai_game):
+        """Preallocate the particle arrays and pre-render particle images."""
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+
+        # All particles live in parallel arrays of fixed size. The live ones
+        # are packed into the first self.count slots.
+        self.budget = self.settings.particle_budget
+        self.x = [0.0] * self.budget
+        self.y = [0.0] * self.budget
+        self.x_speed = [0.0] * self.budget
+        self.y_speed = [0.0] * self.budget
+        self.life = [0] * self.budget
+        self.count = 0
+
+        # Pre-render one small image per fade stage.
+        self.images = []
+        for size, color in zip((4, 4, 3, 3, 2), self.colors):
+            image = pygame.Surface((size, size))
+            image.fill(color)
+            self.images.append(image)
+        self.stage_length = max(1, self.settings.particle_life // len(self.images) + 1)
+
+        # Precompute a table of burst velocities so spawning needs no math.
+        self.velocities = []
+        for _ in range(256):
+            angle = random.uniform(0, 2 * math.pi)
+            speed = random.uniform(0.2, 1.0) * self.settings.particle_speed
+            self.velocities.append((math.cos(angle) * speed, math.sin(angle) * speed))
+        self.next_velocity = 0
+
+        # The blinking explosion flash drawn under each burst, kept the same
+        # way in a small fixed budget. Flashes past the budget are skipped.
+        self.flash_budget = self.settings.flash_budget
+        self.flash_x = [0] * self.flash_budget
+        self.flash_y = [0] * self.flash_budget
+        self.flash_life = [0] * self.flash_budget
+        self.flash_count = 0
+        self.flash_image = pygame.image.load('images/explosion.png')
+        self.flash_half_size = (self.flash_image.get_width() // 2,
+                self.flash_image.get_height() // 2)
+
+    def spawn_burst(self, center):
+        """Spawn a fixed-size burst of particles at center."""
+        # Bursts beyond the global budget are cut short rather than growing.
+        amount = min(self.settings.particles_per_explosion, self.budget - self.count)
+        x, y = center
+        life = self.settings.particle_life
+        velocities = self.velocities
+        v = self.next_velocity
+        for i in range(self.count, self.count + amount):
+            self.x[i] = x
+            self.y[i] = y
+            self.x_speed[i], self.y_speed[i] = velocities[v]
+            self.life[i] = life - (v & 7)
+            v = (v + 1) & 255
+        self.next_velocity = v
+        self.count += amount
+
+        if self.flash_count < self.flash_budget:
+            i = self.flash_count
+            self.flash_x[i] = x - self.flash_half_size[0]
+            self.flash_y[i] = y - self.flash_half_size[1]
+            self.flash_life[i] = self.settings.flash_life
+            self.flash_count += 1
+
+    def update(self):
+        """Move all particles and drop the ones that have burned out."""
+        xs, ys = self.x, self.y
+        x_speeds, y_speeds = self.x_speed, self.y_speed
+        lives = self.life
+        i = 0
+        count = self.count
+        while i < count:
+            lives[i] -= 1
+            if lives[i] <= 0:
+                # Swap the last live particle into this slot.
+                count -= 1
+                xs[i], ys[i] = xs[count], ys[count]
+                x_speeds[i], y_speeds[i] = x_speeds[count], y_speeds[count]
+                lives[i] = lives[count]
+                continue
+            xs[i] += x_speeds[i]
+            ys[i] += y_speeds[i]
+            x_speeds[i] *= 0.96
+            y_speeds[i] *= 0.96
+            i += 1
+        self.count = count
+
+        flash_xs, flash_ys, flash_lives = self.flash_x, self.flash_y, self.flash_life
+        i = 0
+        count = self.flash_count
+        while i < count:
+            flash_lives[i] -= 1
+            if flash_lives[i] <= 0:
+                count -= 1
+                flash_xs[i], flash_ys[i] = flash_xs[count], flash_ys[count]
+                flash_lives[i] = flash_lives[count]
+                continue
+            i += 1
+        self.flash_count = count
+
+    def draw(self):
+        """Draw the visible flashes, then every live particle, in blits() calls."""
+        if self.flash_count:
+            image = self.flash_image
+            blink = self.settings.flash_blink
+            self.screen.blits(
+                    [(image, (self.flash_x[i], self.flash_y[i]))
+                        for i in range(self.flash_count)
+                        if not (self.flash_life[i] // blink) & 1],
+                    doreturn=False)
+        if not self.count:
+            return
+        images = self.images
+        last_stage = len(images) - 1
+        life = self.settings.particle_life
+        stage_length = self.stage_length
+        xs, ys, lives = self.x, self.y, self.life
+        self.screen.blits(
+                [(images[min(last_stage, (life - lives[i]) // stage_length)], (xs[i], ys[i]))
+                    for i in range(self.count)],
+                doreturn=False)
+
+    def empty(self):
+        """Remove all particles and flashes."""
+        self.count = 0
+        self.flash_count = 0
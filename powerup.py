@@ -3,6 +3,8 @@ from pygame.sprite import Sprite
 
 class PowerUp(Sprite):
     """A class to manage power-ups dropped by aliens."""
+    image = None
+    mask = None
 
     def __init__(self, ai_game, center):
         """Create a power-up object at the alien's position."""
@@ -10,12 +12,16 @@ class PowerUp(Sprite):
         self.screen = ai_game.screen
         self.settings = ai_game.settings
 
-        # Load the power-up image.
-        try:
-            self.image = pygame.image.load('images/star.png')
-        except FileNotFoundError:
-            self.image = pygame.Surface((30, 30))
-            self.image.fill((255, 215, 0)) # Gold color
+        # Load the power-up image and its mask once and share them.
+        if PowerUp.image is None:
+            try:
+                PowerUp.image = pygame.image.load('images/star.png')
+            except FileNotFoundError:
+                PowerUp.image = pygame.Surface((30, 30))
+                PowerUp.image.fill((255, 215, 0)) # Gold color
+            PowerUp.mask = pygame.mask.from_surface(PowerUp.image)
+        self.image = PowerUp.image
+        self.mask = PowerUp.mask
 
         self.rect = self.image.get_rect()
         self.rect.center = center
@@ -7,10 +7,13 @@ class Settings:
         self.screen_width = 1200
         self.screen_height = 800
         self.bg_color = (0, 0, 0)
+        self.frame_rate = 60
         
         # Ship settings
         self.ship_speed = 5.5
         self.ship_limit = 3
+        # Pause in milliseconds after the ship is hit.
+        self.ship_hit_delay = 500
 
         # Bullet settings
         self.bullet_speed = 10.0
@@ -20,11 +23,80 @@ class Settings:
         self.bullet_allowed = 3
 
         # Alien settings
+        # Formation, movement and firing of each level.
+        self.waves_file = 'waves.json'
         self.alien_speed = 1.0
         self.fleet_drop_speed = 10
         # fleet_direction of 1 represents rigth; -1 represents left.
         self.fleet_direction = 1
         self.alien_bullet_speed = 3.0
 
+        # Input settings
+        # Read held movement keys each frame rather than trusting KEYUP alone.
+        self.input_poll_held_keys = True
+        # Move the ship by the keys held just before the flip, not at frame start.
+        self.input_late_latch = False
+        # Print input latency histograms on exit.
+        self.input_latency_report = False
+
+        # Collision settings
+        # Check masks after rects overlap so hits match the drawn pixels.
+        self.pixel_collisions = True
+        # Alien bullet rotations are snapped to this many degrees.
+        self.rotation_bucket = 5
+
+        # Co-op network settings
+        self.net_port = 5555
+        # Frames between state snapshots sent to the partner. Every alien of
+        # a chase wave is sent each snapshot, so big chase fleets go in turns
+        # and lag on the partner's screen; other waves send only changes.
+        self.net_snapshot_interval = 2
+        # Pixels the partner's predicted ship may drift before snapping back.
+        self.net_snap_distance = 64
+        # Frames without input from the partner before their ship stops.
+        self.net_input_timeout = 30
+
+        # Rewind and save settings
+        # Hold Backspace to rewind; F5 quick-saves and F9 quick-loads.
+        self.rewind_seconds = 10
+        self.rewind_keyframe_interval = 30
+        self.quicksave_file = 'quicksave.bin'
+        self.checkpoint_file = 'checkpoint.bin'
+        # Seconds between crash-recovery checkpoints; 0 turns them off.
+        self.checkpoint_seconds = 30
+
+        # Telemetry settings
+        self.telemetry_enabled = True
+        self.telemetry_dir = 'telemetry'
+        # Events held in memory before the oldest are dropped.
+        self.telemetry_buffer = 100_000
+        self.telemetry_flush_seconds = 1.0
+        # Compressed size at which a new file is started, and files kept.
+        self.telemetry_file_bytes = 1_000_000
+        self.telemetry_max_files = 50
+        # Frames summarised in each frame-time event.
+        self.telemetry_frame_batch = 300
+
+        # Particle settings
+        self.particle_budget = 3000
+        self.particles_per_explosion = 24
+        # Particle lifetime in frames.
+        self.particle_life = 45
+        self.particle_speed = 4.0
+        # Explosion flashes drawn at once, their lifetime and blink period
+        # in frames.
+        self.flash_budget = 16
+        self.flash_life = 180
+        self.flash_blink = 6
+
         # Scoring
         self.alien_points = 50
+        self.high_score_file = 'high_score.txt'
+
+        # Frame capture settings (toggle with F12).
+        self.capture_enabled = False
+        self.capture_every_n = 1
+        self.capture_buffers = 8
+        # 'bmp', 'png' or 'raw' (one file of back-to-back frames).
+        self.capture_format = 'bmp'
+        self.capture_dir = 'captures'
@@ -14,10 +14,12 @@ class Ship:
         self.image = pygame.image.load('images/ship.png')
         self.rect = self.image.get_rect()
 
-        # Pre-render rotations
+        # Pre-render rotations and their collision masks
         self.rotated_surfaces = {}
+        self.rotated_masks = {}
         for angle in range(0, 360, 45):
             self.rotated_surfaces[angle] = pygame.transform.rotate(self.image, angle)
+            self.rotated_masks[angle] = pygame.mask.from_surface(self.rotated_surfaces[angle])
 
         # Start each new ship at the bottom center of the screen.
         self.rect.midbottom = self.screen_rect.midbottom
@@ -38,6 +40,16 @@ class Ship:
         self.invulnerable = False
         self.invulnerable_start_time = 0
 
+    @property
+    def mask(self):
+        """Return the collision mask for the ship's current rotation."""
+        return self.rotated_masks[self.angle]
+
+    @property
+    def mask_rect(self):
+        """Return the rect the rotated ship is drawn at."""
+        return self.rotated_surfaces[self.angle].get_rect(center=self.rect.center)
+
     def update(self):
         """Update the ship's position based on the movement flag."""
         if self.moving_right and self.rect.right < self.screen_rect.right:
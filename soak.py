@@ -0,0 +1,244 @@
+"""Run Alien Invasion headless for a long time and look for leaks.
+
+Usage: python soak.py --frames 1000000 [--tracemalloc] [--csv samples.csv]
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Run without a window or sound device.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+# The game loads its images and sounds relative to its own directory.
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+from settings import Settings
+from alien_invasion import AlienInvasion
+from autopilot import Autopilot
+
+def read_rss_kb():
+    """Return the resident set size of this process in kilobytes."""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, IndexError):
+        import resource
+        # Peak rather than current RSS, but still shows growth.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+class SoakTest:
+    """A class to run the game headless and sample it for growth."""
+
+    # Metrics checked for monotonic growth or drift.
+    tracked = ('bullets', 'alien_bullets', 'flashes', 'powerups', 'aliens',
+            'particles', 'rss_kb', 'traced_kb', 'frame_ms')
+
+    def __init__(self, args):
+        """Create the game, its autopilot, and the sample store."""
+        self.args = args
+        settings = Settings()
+        settings.ship_hit_delay = 0
+        # The autopilot posts key events; no real keys are ever held.
+        settings.input_poll_held_keys = False
+        settings.high_score_file = os.path.join(tempfile.gettempdir(),
+                'alien_invasion_soak_high_score.txt')
+        settings.checkpoint_file = os.path.join(tempfile.gettempdir(),
+                'alien_invasion_soak_checkpoint.bin')
+        settings.telemetry_dir = os.path.join(tempfile.gettempdir(),
+                'alien_invasion_soak_telemetry')
+        self.ai_game = AlienInvasion(settings)
+        self.autopilot = Autopilot(self.ai_game, seed=args.seed)
+        self.samples = []
+        self.snapshot = None
+        # The last periodic snapshot, and for each allocation site that grew
+        # between every snapshot since, [frame growth began, snapshots, bytes].
+        self.last_snapshot = None
+        self.last_snapshot_frame = 0
+        self.site_streaks = {}
+
+    def run(self):
+        """Play args.frames frames, sampling every args.sample_every."""
+        if self.args.tracemalloc:
+            tracemalloc.start(10)
+            self.snapshot = tracemalloc.take_snapshot()
+            self.last_snapshot = self._take_snapshot()
+
+        frame_times = []
+        for frame in range(1, self.args.frames + 1):
+            start = time.perf_counter()
+            self.autopilot.post_events()
+            self.ai_game._run_frame()
+            frame_times.append(time.perf_counter() - start)
+
+            if frame % self.args.sample_every == 0:
+                self._take_sample(frame, frame_times)
+                frame_times = []
+
+        problems = self.find_growth()
+        self._report(problems)
+        if self.args.csv:
+            self._write_csv(self.args.csv)
+        return problems
+
+    def _take_sample(self, frame, frame_times):
+        """Record group sizes, memory use, and frame time."""
+        game = self.ai_game
+        sample = {
+            'frame': frame,
+            'bullets': len(game.bullets),
+            'alien_bullets': len(game.alien_bullets),
+            'flashes': game.particles.flash_count,
+            'powerups': len(game.powerups),
+            'aliens': len(game.aliens),
+            'particles': game.particles.count,
+            'rss_kb': read_rss_kb(),
+            'traced_kb': 0,
+            'frame_ms': 1000 * sum(frame_times) / len(frame_times),
+            'max_frame_ms': 1000 * max(frame_times),
+        }
+        if self.args.tracemalloc:
+            sample['traced_kb'] = tracemalloc.get_traced_memory()[0] // 1024
+            sample['top_site'] = ''
+            sample['top_site_kb'] = 0
+            if len(self.samples) % self.args.snapshot_every == 0:
+                self._compare_snapshot(frame, sample)
+        self.samples.append(sample)
+
+        if self.args.verbose:
+            print(' '.join(f"{key}={value:.2f}" if isinstance(value, float)
+                    else f"{key}={value}" for key, value in sample.items()))
+
+    def _take_snapshot(self):
+        """Return a snapshot of allocations, leaving out tracemalloc's own."""
+        return tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+                tracemalloc.Filter(False, '<unknown>'),
+        ))
+
+    def _compare_snapshot(self, frame, sample):
+        """Note the sites whose allocations grew since the last snapshot."""
+        snapshot = self._take_snapshot()
+        stats = snapshot.compare_to(self.last_snapshot, 'lineno')
+        growing = sorted((stat for stat in stats if stat.size_diff > 0),
+                key=lambda stat: stat.size_diff, reverse=True)[:self.args.top_sites]
+        self.last_snapshot = snapshot
+        if growing:
+            sample['top_site'] = str(growing[0].traceback[0])
+            sample['top_site_kb'] = growing[0].size_diff // 1024
+
+        # Warm-up growth is expected; only track streaks after it.
+        if frame > self.args.warmup:
+            sites = {str(stat.traceback[0]): stat.size_diff for stat in growing}
+            self.site_streaks = {site: streak for site, streak in self.site_streaks.items()
+                    if site in sites}
+            for site, size_diff in sites.items():
+                streak = self.site_streaks.setdefault(site, [self.last_snapshot_frame, 0, 0])
+                streak[1] += 1
+                streak[2] += size_diff
+        self.last_snapshot_frame = frame
+
+    def find_growth(self):
+        """Return a list of (metric, reason) for metrics that keep growing.
+
+        A metric is flagged if it rose at every one of the last `window`
+        samples, or if its mean over the last third of the run is more than
+        `drift` (a fraction) above its mean over the first third. With
+        tracemalloc, an allocation site is flagged if it was among the top
+        growers at each of the last `window` snapshots. Samples taken
+        during warm-up, while caches and the rewind buffer fill, are left
+        out.
+        """
+        problems = []
+        window = self.args.window
+        samples = [sample for sample in self.samples
+                if sample['frame'] > self.args.warmup]
+        thirds = len(samples) // 3
+        for metric in self.tracked:
+            values = [sample[metric] for sample in samples]
+
+            recent = values[-(window + 1):]
+            if len(recent) > window and all(b > a for a, b in zip(recent, recent[1:])):
+                problems.append((metric,
+                        f"rose in each of the last {window} samples "
+                        f"({recent[0]} -> {recent[-1]})"))
+                continue
+
+            if thirds:
+                early = sum(values[:thirds]) / thirds
+                late = sum(values[-thirds:]) / thirds
+                if late > early * (1 + self.args.drift) + self.args.slack.get(metric, 0):
+                    problems.append((metric,
+                            f"drifted from a mean of {early:.1f} to {late:.1f}"))
+
+        for site, (start, snapshots, size) in self.site_streaks.items():
+            if snapshots >= window:
+                problems.append((f"allocations at {site}",
+                        f"grew at each of {snapshots} snapshots since frame {start} "
+                        f"(+{size // 1024} KB)"))
+        return problems
+
+    def _report(self, problems):
+        """Print a summary of the run and anything that looked like a leak."""
+        frames = self.samples[-1]['frame'] if self.samples else 0
+        worst = max((sample['max_frame_ms'] for sample in self.samples), default=0)
+        print(f"Soaked {frames} frames in {len(self.samples)} samples; "
+                f"worst frame {worst:.2f} ms.")
+
+        if not problems:
+            print("No growth detected.")
+        for metric, reason in problems:
+            print(f"GROWTH {metric}: {reason}")
+
+        if self.snapshot:
+            print("Top allocation growth since start:")
+            stats = tracemalloc.take_snapshot().compare_to(self.snapshot, 'lineno')
+            for stat in stats[:10]:
+                print(f"  {stat}")
+
+    def _write_csv(self, path):
+        """Write every sample as a row of a CSV file."""
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(self.samples[0]))
+            writer.writeheader()
+            writer.writerows(self.samples)
+
+def parse_args(argv=None):
+    """Parse the soak test's command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=1_000_000)
+    parser.add_argument('--sample-every', type=int, default=5000,
+            help="frames between samples")
+    parser.add_argument('--window', type=int, default=8,
+            help="consecutive rising samples that count as growth")
+    parser.add_argument('--drift', type=float, default=0.25,
+            help="allowed rise of the late mean over the early mean")
+    parser.add_argument('--warmup', type=int, default=20000,
+            help="frames to run before samples count towards growth")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tracemalloc', action='store_true',
+            help="trace Python allocations (much slower)")
+    parser.add_argument('--snapshot-every', type=int, default=4,
+            help="samples between tracemalloc snapshots")
+    parser.add_argument('--top-sites', type=int, default=10,
+            help="growing allocation sites tracked at each snapshot")
+    parser.add_argument('--csv', help="write all samples to this file")
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    # Absolute headroom per metric so small counts and timer noise don't
+    # trip the drift check.
+    args.slack = {'bullets': 3, 'alien_bullets': 5, 'flashes': 5,
+            'powerups': 2, 'aliens': 5, 'particles': 100, 'rss_kb': 4096,
+            'traced_kb': 512, 'frame_ms': 0.5}
+    return args
+
+if __name__ == '__main__':
+    problems = SoakTest(parse_args()).run()
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,189 @@
+"""Play many headless games per Settings variation and tabulate the results.
+
+Usage:
+    python sweep.py --set alien_speed=0.5,1,1.5 --set ship_limit=3,5
+    python sweep.py --samples 40 --range alien_bullet_speed=1:6 --set bullet_allowed=2,3,4
+"""
+import argparse
+import csv
+import itertools
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Run without a window or sound device.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+# The game loads its images and sounds relative to its own directory.
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+from settings import Settings
+from alien_invasion import AlienInvasion
+from autopilot import Autopilot
+from waves import load_waves
+
+def make_settings(overrides):
+    """Return headless Settings with the given overrides applied."""
+    settings = Settings()
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+    # Nothing a session does should touch files or wait on real time.
+    settings.ship_hit_delay = 0
+    settings.telemetry_enabled = False
+    settings.input_poll_held_keys = False
+    settings.input_latency_report = False
+    settings.checkpoint_seconds = 0
+    settings.high_score_file = os.path.join(tempfile.gettempdir(),
+            f"alien_invasion_sweep_{os.getpid()}.txt")
+    return settings
+
+def play_session(task):
+    """Play one game to the end (or max_frames) and return its results."""
+    config, overrides, level, seed, max_frames = task
+    random.seed(seed)
+    ai_game = AlienInvasion(make_settings(overrides))
+    autopilot = Autopilot(ai_game, seed=seed, pause_chance=0, quit_chance=0)
+    autopilot.next_level = level
+
+    # Get through the menu before timing anything.
+    while ai_game.first_game:
+        autopilot.post_events()
+        ai_game._run_frame()
+
+    frames = 0
+    start = time.perf_counter()
+    while ai_game.game_active and frames < max_frames:
+        autopilot.post_events()
+        ai_game._run_frame()
+        frames += 1
+    elapsed = time.perf_counter() - start
+
+    return config, {
+        'survival_s': frames / ai_game.settings.frame_rate,
+        'survived': ai_game.game_active,
+        'score': ai_game.stats.score,
+        'frame_ms': 1000 * elapsed / max(1, frames),
+    }
+
+def parse_value(name, text):
+    """Convert text to the type of the named setting's default value."""
+    default = getattr(Settings(), name)
+    if isinstance(default, bool):
+        return text.lower() in ('1', 'true', 'yes')
+    return type(default)(text)
+
+def build_configs(args, parser):
+    """Return the list of override dicts to play."""
+    defaults = Settings()
+    choices = {}
+    for spec in args.set:
+        name, _, values = spec.partition('=')
+        if not hasattr(defaults, name) or not values:
+            parser.error(f"--set {spec}: expected an existing setting=value,value,...")
+        choices[name] = [parse_value(name, value) for value in values.split(',')]
+
+    ranges = {}
+    for spec in args.range:
+        name, _, bounds = spec.partition('=')
+        low, _, high = bounds.partition(':')
+        if not hasattr(defaults, name) or not high:
+            parser.error(f"--range {spec}: expected an existing setting=low:high")
+        ranges[name] = (parse_value(name, low), parse_value(name, high))
+
+    if not args.samples:
+        if ranges:
+            parser.error("--range needs --samples")
+        names = list(choices)
+        return [dict(zip(names, values))
+                for values in itertools.product(*choices.values())]
+
+    # Random sampling: pick from each --set list and within each --range.
+    sampler = random.Random(args.seed)
+    configs = []
+    for _ in range(args.samples):
+        config = {name: sampler.choice(values) for name, values in choices.items()}
+        for name, (low, high) in ranges.items():
+            if isinstance(low, int):
+                config[name] = sampler.randint(low, high)
+            else:
+                config[name] = round(sampler.uniform(low, high), 3)
+        configs.append(config)
+    return configs
+
+def summarise(config, results):
+    """Aggregate the sessions of one configuration into a table row."""
+    survival = [result['survival_s'] for result in results]
+    scores = [result['score'] for result in results]
+    row = dict(config)
+    row.update({
+        'sessions': len(results),
+        'survival_s_mean': round(statistics.mean(survival), 2),
+        'survival_s_stdev': round(statistics.pstdev(survival), 2),
+        'survived_frac': round(sum(r['survived'] for r in results) / len(results), 3),
+        'score_mean': round(statistics.mean(scores), 1),
+        'score_per_min': round(60 * sum(scores) / max(1e-9, sum(survival)), 1),
+        'frame_ms_mean': round(statistics.mean(r['frame_ms'] for r in results), 3),
+        'frame_ms_max': round(max(r['frame_ms'] for r in results), 3),
+    })
+    return row
+
+def main(argv=None):
+    """Run the sweep described on the command line and write the table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=V1,V2,...',
+            help="values to try for a setting (repeatable)")
+    parser.add_argument('--range', action='append', default=[], metavar='NAME=LOW:HIGH',
+            help="range to sample a setting from; needs --samples")
+    parser.add_argument('--samples', type=int, default=0,
+            help="random configurations to draw instead of the full grid")
+    parser.add_argument('--sessions', type=int, default=8,
+            help="games played per configuration")
+    parser.add_argument('--level', type=int, default=1)
+    parser.add_argument('--max-frames', type=int, default=18000,
+            help="frames after which a game counts as survived")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='sweep.csv')
+    args = parser.parse_args(argv)
+
+    if not 1 <= args.level <= len(load_waves(Settings().waves_file)):
+        parser.error(f"--level {args.level}: no such level")
+    configs = build_configs(args, parser)
+    if not configs or not configs[0]:
+        parser.error("nothing to sweep; give at least one --set or --range")
+
+    # One task per session so work spreads evenly over the pool.
+    tasks = [(index, config, args.level, args.seed * 100_003 + index * 1009 + session,
+            args.max_frames)
+            for index, config in enumerate(configs)
+            for session in range(args.sessions)]
+    results = [[] for _ in configs]
+
+    start = time.perf_counter()
+    pool = multiprocessing.Pool(args.workers)
+    for done, (index, result) in enumerate(
+            pool.imap_unordered(play_session, tasks), 1):
+        results[index].append(result)
+        print(f"\r{done}/{len(tasks)} sessions", end='', file=sys.stderr)
+    # SDL catches SIGTERM in the workers, so let them exit rather than
+    # terminating them as the pool's context manager would.
+    pool.close()
+    pool.join()
+    print(f"\nPlayed {len(tasks)} sessions in {time.perf_counter() - start:.1f} s "
+            f"on {args.workers} workers.", file=sys.stderr)
+
+    rows = [summarise(config, result) for config, result in zip(configs, results)]
+    with open(args.out, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Wrote {len(rows)} rows to {args.out}.", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
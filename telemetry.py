@@ -0,0 +1,160 @@
+import collections
+import gzip
+import json
+import os
+import threading
+import time
+
+# Field names for each event type, in the order emit() is given them.
+EVENT_FIELDS = {
+    'session_start': ('level',),
+    'shot': ('level',),
+    'hit': ('level', 'aliens', 'score'),
+    'death': ('level', 'ships_left', 'score'),
+    'powerup_pickup': ('level',),
+    'powerup_expired': ('level',),
+    'pause': ('level', 'seconds'),
+    'frames': ('frames', 'mean_ms', 'max_ms'),
+    'input_latency': ('stage', 'events', 'p50_ms', 'p95_ms', 'p99_ms'),
+    'capture': ('captured', 'written', 'dropped'),
+    'overflow': ('dropped',),
+}
+
+class Telemetry:
+    """A class to record gameplay events and write them out in batches.
+
+    emit() only appends a tuple to a deque, which never blocks; a writer
+    thread drains it into rotating, gzip-compressed JSONL files. If the
+    writer falls behind the oldest events are dropped, and the batch ends
+    with an overflow event giving how many appends found the buffer full.
+    """
+
+    def __init__(self, ai_game):
+        """Initialize the event buffer and frame-time counters."""
+        self.settings = ai_game.settings
+        self.enabled = self.settings.telemetry_enabled
+        self.events = collections.deque(maxlen=self.settings.telemetry_buffer)
+        # Bound once so emit() does no attribute lookups it can avoid.
+        self._append = self.events.append
+        self._clock = time.perf_counter
+        self._capacity = self.events.maxlen
+        # Events pushed out of the buffer by appending while it was full,
+        # and how many of those the writer has reported so far.
+        self.dropped = 0
+        self.reported_drops = 0
+
+        self.session = time.strftime('%Y%m%d-%H%M%S')
+        self.start_time = time.perf_counter()
+        self.file_number = 0
+        self.raw_file = None
+        self.gzip_file = None
+
+        # Frame times are summarised rather than sent one by one.
+        self.frames = 0
+        self.frame_total = 0.0
+        self.frame_max = 0.0
+
+        self.stopping = threading.Event()
+        self.writer = None
+        if self.enabled:
+            self.writer = threading.Thread(target=self._write_events, daemon=True)
+            self.writer.start()
+
+    def emit(self, event, *fields):
+        """Record an event; see EVENT_FIELDS for the fields of each type."""
+        if self.enabled:
+            # Drops are counted only when the buffer is at capacity. The
+            # writer only ever shortens it, so a popleft() racing this
+            # check can't make an append with room look like a drop,
+            # though it may free the slot after a drop was counted.
+            if len(self.events) >= self._capacity:
+                self.dropped += 1
+            self._append((self._clock(), event, fields))
+
+    def record_frame(self, seconds):
+        """Add a frame time, emitting a summary every telemetry_frame_batch."""
+        if not self.enabled:
+            return
+        self.frames += 1
+        self.frame_total += seconds
+        if seconds > self.frame_max:
+            self.frame_max = seconds
+        if self.frames >= self.settings.telemetry_frame_batch:
+            self.emit('frames', self.frames,
+                    round(1000 * self.frame_total / self.frames, 3),
+                    round(1000 * self.frame_max, 3))
+            self.frames = 0
+            self.frame_total = 0.0
+            self.frame_max = 0.0
+
+    def stop(self):
+        """Write out any remaining events and close the current file."""
+        if not self.writer:
+            return
+        self.stopping.set()
+        self.writer.join()
+        self.writer = None
+
+    def _write_events(self):
+        """Flush events in batches until stop() is called."""
+        while not self.stopping.wait(self.settings.telemetry_flush_seconds):
+            self._flush()
+        self._flush()
+        self._close_file()
+
+    def _flush(self):
+        """Write every buffered event to the current file."""
+        if not self.events:
+            return
+        lines = []
+        while True:
+            try:
+                timestamp, event, fields = self.events.popleft()
+            except IndexError:
+                break
+            record = {'t': round(timestamp - self.start_time, 4), 'event': event}
+            record.update(zip(EVENT_FIELDS[event], fields))
+            lines.append(json.dumps(record, separators=(',', ':')))
+        dropped = self.dropped
+        if dropped != self.reported_drops:
+            lines.append(json.dumps({'t': round(time.perf_counter() - self.start_time, 4),
+                    'event': 'overflow', 'dropped': dropped - self.reported_drops},
+                    separators=(',', ':')))
+            self.reported_drops = dropped
+
+        try:
+            if not self.gzip_file:
+                self._open_file()
+            self.gzip_file.write(('\n'.join(lines) + '\n').encode())
+            self.gzip_file.flush()
+            if self.raw_file.tell() >= self.settings.telemetry_file_bytes:
+                self._close_file()
+        except OSError:
+            # A full or missing disk loses this batch, never the game.
+            self._close_file()
+
+    def _open_file(self):
+        """Start the next file in the session, removing the oldest files."""
+        os.makedirs(self.settings.telemetry_dir, exist_ok=True)
+        self.file_number += 1
+        path = os.path.join(self.settings.telemetry_dir,
+                f"session-{self.session}-{self.file_number:04d}.jsonl.gz")
+        self.raw_file = open(path, 'wb')
+        self.gzip_file = gzip.GzipFile(fileobj=self.raw_file, mode='wb')
+
+        files = sorted(name for name in os.listdir(self.settings.telemetry_dir)
+                if name.endswith('.jsonl.gz'))
+        for name in files[:-self.settings.telemetry_max_files]:
+            os.remove(os.path.join(self.settings.telemetry_dir, name))
+
+    def _close_file(self):
+        """Finish the current file, if one is open."""
+        try:
+            if self.gzip_file:
+                self.gzip_file.close()
+            if self.raw_file:
+                self.raw_file.close()
+        except OSError:
+            pass
+        self.gzip_file = None
+        self.raw_file = None
@@ -0,0 +1,97 @@
+import json
+import math
+import random
+
+# Movement patterns worked out each frame from the game state.
+REACTIVE_PATTERNS = ('march', 'bounce', 'chase')
+
+# Scripted movement patterns: functions of the angle through one period
+# returning an (x, y) offset in units of the wave's amplitudes.
+SCRIPTED_PATTERNS = {
+    'sine': lambda a: (math.sin(a), 0.0),
+    'circle': lambda a: (math.cos(a), math.sin(a)),
+    'figure_eight': lambda a: (math.sin(a), math.sin(2 * a)),
+    'zigzag': lambda a: (2 / math.pi * math.asin(math.sin(a)), 0.0),
+}
+
+def compile_path(pattern, amplitude_x, amplitude_y, period):
+    """Return per-tick x and y offset tables for a scripted pattern."""
+    offset = SCRIPTED_PATTERNS[pattern]
+    path_x, path_y = [], []
+    for tick in range(period):
+        x, y = offset(2 * math.pi * tick / period)
+        path_x.append(round(x * amplitude_x))
+        path_y.append(round(y * amplitude_y))
+    return path_x, path_y
+
+class Wave:
+    """A class to hold one wave's formation, movement and firing."""
+
+    def __init__(self, data):
+        """Read a wave from its entry in the waves file."""
+        self.name = data['name']
+
+        # Spacing between aliens, in alien widths and heights.
+        formation = data.get('formation', {})
+        self.x_spacing = formation.get('x_spacing', 4)
+        self.y_spacing = formation.get('y_spacing', 8)
+        # Limit on the number of rows; None fills the screen.
+        self.rows = formation.get('rows')
+
+        movement = data.get('movement', {})
+        self.pattern = movement.get('pattern', 'march')
+        # Ticks each alien runs ahead of the one before it on its path.
+        self.phase_step = movement.get('phase_step', 0)
+        self.path_x, self.path_y = [], []
+        if self.pattern in SCRIPTED_PATTERNS:
+            self.path_x, self.path_y = compile_path(self.pattern,
+                    movement.get('amplitude_x', 0), movement.get('amplitude_y', 0),
+                    movement.get('period', 240))
+        elif self.pattern not in REACTIVE_PATTERNS:
+            raise ValueError(f"Wave '{self.name}' has unknown pattern '{self.pattern}'.")
+
+        # Alien shots per second across the whole fleet.
+        self.fire_rate = data.get('fire_rate', 0.0)
+        self.powerups = data.get('powerups', 1)
+
+def load_waves(path):
+    """Load the list of waves from a JSON file."""
+    with open(path) as f:
+        waves = [Wave(data) for data in json.load(f)]
+    if not waves:
+        raise ValueError(f"No waves defined in {path}.")
+    return waves
+
+class FireSchedule:
+    """A class to decide ahead of time which ticks an alien fires on."""
+
+    def __init__(self, fire_rate, frame_rate, size=64):
+        """Precompute a cycle of gaps between shots for fire_rate."""
+        self.intervals = []
+        chance = fire_rate / frame_rate if frame_rate else 0
+        if chance >= 1:
+            self.intervals = [1]
+        elif chance > 0:
+            # Gaps between shots when each tick fires with this chance.
+            scale = math.log(1 - chance)
+            self.intervals = [max(1, math.ceil(math.log(1 - random.random()) / scale))
+                    for _ in range(size)]
+
+        self.index = 0
+        self.next_tick = self.intervals[0] if self.intervals else None
+
+    def due(self, tick):
+        """Return True if an alien should fire on this tick."""
+        if self.next_tick is None or tick < self.next_tick:
+            return False
+        self.index = (self.index + 1) % len(self.intervals)
+        self.next_tick = tick + self.intervals[self.index]
+        return True
+
+    def rebase(self, tick):
+        """Schedule the next shot one interval after tick.
+
+        Needed whenever the fleet's clock is set back, e.g. by a restore.
+        """
+        if self.intervals:
+            self.next_tick = tick + self.intervals[self.index]